@@ -1,7 +1,7 @@
 from dotenv import load_dotenv
 load_dotenv()
 
-from dash import Dash, html, dcc, Input, Output, State
+from dash import Dash, html, dcc, Input, Output, State, ClientsideFunction
 import dash_bootstrap_components as dbc
 import os
 import pandas as pd
@@ -14,6 +14,11 @@ from components.sus_layout import (
     ia_layout
 )
 from components.sus_callbacks import register_callbacks as register_sus_callbacks
+from components.sus_data import load_sample_dataset
+from components.jobs import background_manager, job_panel
+from components.upload_api import register_routes as register_upload_routes
+from components.pdf_api import register_routes as register_pdf_routes
+from components.renderer import start_renderers
 
 # ── ATTRAKDIFF ──────────────────────────────────────────────
 from components.attrakdiff_layout import (
@@ -32,6 +37,8 @@ from components.attrakdiff_callbacks import register_callbacks as register_attra
 app = Dash(
     __name__,
     suppress_callback_exceptions=True,
+    # PDF et IA exécutés hors du worker (processus fils + cache disque)
+    background_callback_manager=background_manager,
     external_stylesheets=[
         dbc.themes.SANDSTONE,
         "https://cdn.jsdelivr.net/npm/bootstrap-icons@1.11.1/font/bootstrap-icons.css"
@@ -198,6 +205,9 @@ app.layout = html.Div([
 
         # --- Stores & composants SUS ---
         dcc.Store(id="data-store",  storage_type="session"),
+        dcc.Store(id="data-loaded"),
+        dcc.Store(id="sus-filter"),
+        dcc.Store(id="upload-result"),
         dcc.Store(id="fig-store",   storage_type="session"),
         dcc.Store(id="ai-analysis", storage_type="session"),
         html.Div(id="ai-processing"),
@@ -205,16 +215,22 @@ app.layout = html.Div([
         html.Div(id="export-status"),
         html.Div(id="pdf-preview"),
         html.Div(id="pdf-download-zone"),
-        dcc.Download(id="download-pdf"),
+        job_panel("sus-pdf-job"),
+        dcc.Store(id="download-pdf-url"),
 
         # --- Stores & composants AttrakDiff ---
         dcc.Store(id="attrakdiff-store"),
+        dcc.Store(id="attrakdiff-ai-store"),
+        dcc.Store(id="attrakdiff-loaded"),
+        dcc.Store(id="attrakdiff-upload-result"),
         dcc.Download(id="attrakdiff-download-template"),
         html.Div(id="attrakdiff-results"),
         html.Div(id="attrakdiff-upload-status"),
         html.Div(id="attrakdiff-pdf-preview"),
         html.Div(id="attrakdiff-pdf-download-zone"),
         dcc.Markdown(id="attrakdiff-ia-text"),
+        job_panel("attrakdiff-ai-job"),
+        job_panel("attrakdiff-pdf-job"),
 
     ], style={"display": "none"}),
 
@@ -293,35 +309,32 @@ def render_page(pathname):
 # 5) OPEN/CLOSE MODALS
 # ====================================================
 
-@app.callback(
+app.clientside_callback(
+    ClientsideFunction(namespace="ux", function_name="toggle"),
     Output("modal-about", "is_open"),
     Input("open-about", "n_clicks"),
     Input("close-about", "n_clicks"),
     State("modal-about", "is_open"),
     prevent_initial_call=True,
 )
-def toggle_about(open_click, close_click, is_open):
-    return not is_open
 
-@app.callback(
+app.clientside_callback(
+    ClientsideFunction(namespace="ux", function_name="toggle"),
     Output("modal-rgpd", "is_open"),
     Input("open-rgpd", "n_clicks"),
     Input("close-rgpd", "n_clicks"),
     State("modal-rgpd", "is_open"),
     prevent_initial_call=True,
 )
-def toggle_rgpd(open_click, close_click, is_open):
-    return not is_open
 
-@app.callback(
+app.clientside_callback(
+    ClientsideFunction(namespace="ux", function_name="toggle"),
     Output("modal-feedback", "is_open"),
     Input("open-feedback", "n_clicks"),
     Input("close-feedback", "n_clicks"),
     State("modal-feedback", "is_open"),
     prevent_initial_call=True,
 )
-def toggle_feedback(open_click, close_click, is_open):
-    return not is_open
 
 # ====================================================
 # 6) FEEDBACK
@@ -362,6 +375,16 @@ def save_feedback(n, email, message):
 
 register_sus_callbacks(app)
 register_attrakdiff_callbacks(app)
+register_upload_routes(app)
+register_pdf_routes(app)
+
+# Exemple lu et scoré une fois au démarrage (bouton « Charger un exemple »).
+# Pas dans les processus « spawn » du pool d'import par lots : ils
+# réimportent ce script sous le nom __mp_main__
+if __name__ != "__mp_main__":
+    load_sample_dataset()
+    # Processus de rendu (instances kaleido chaudes) lancé dès le boot
+    start_renderers()
 
 # ====================================================
 # 8) GOOGLE ANALYTICS
@@ -0,0 +1,41 @@
+// ============================================================
+// Callbacks clientside (namespace "ux") : affichage des onglets,
+// ouverture/fermeture des modales — aucun aller-retour serveur.
+// ============================================================
+
+window.dash_clientside = window.dash_clientside || {};
+window.dash_clientside.ux = {
+    // Inverse l'état d'une modale (bouton ouvrir / fermer)
+    toggle: function (openClicks, closeClicks, isOpen) {
+        return !isOpen;
+    },
+
+    // Indicateur léger « dataset chargé » dérivé du Store
+    sus_loaded: function (data) {
+        return Boolean(data);
+    },
+    attrakdiff_loaded: function (store) {
+        return Boolean(store && store.n > 0);
+    },
+
+    // Export PDF : téléchargement du fichier servi par /api/pdf, puis
+    // URL effacée du Store
+    download_pdf: function (url) {
+        if (!url) {
+            return window.dash_clientside.no_update;
+        }
+        window.location.assign(url + "?download=1");
+        return true;
+    },
+
+    // Onglets : dashboard visible seulement si un dataset est chargé
+    show_tabs: function (active, loaded) {
+        var show = {display: "block"}, hide = {display: "none"};
+        return [
+            active === "tab-dashboard" && loaded ? show : hide,
+            active === "tab-details" ? show : hide,
+            active === "tab-ia" ? show : hide,
+            active === "tab-pdf" ? show : hide
+        ];
+    }
+};
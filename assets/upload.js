@@ -0,0 +1,53 @@
+// ============================================================
+// Import direct des fichiers vers /api/upload/<kind> (multipart)
+// — évite l'encodage base64 de dcc.Upload pour les gros fichiers.
+// Le résultat (handle du dataset) est poussé dans un dcc.Store.
+// Le glisser-déposer reste géré par dcc.Upload (repli base64).
+// ============================================================
+
+(function () {
+    var TARGETS = {
+        "upload-data":           {kind: "sus",        store: "upload-result", append: "upload-append", multiple: true},
+        "attrakdiff-upload-btn": {kind: "attrakdiff", store: "attrakdiff-upload-result"}
+    };
+
+    function findTarget(el) {
+        while (el && el !== document) {
+            if (el.id && TARGETS[el.id]) return TARGETS[el.id];
+            el = el.parentNode;
+        }
+        return null;
+    }
+
+    function setResult(target, data) {
+        // Horodatage : un même fichier réimporté déclenche quand même le callback
+        data.ts = Date.now();
+        window.dash_clientside.set_props(target.store, {data: data});
+    }
+
+    window.addEventListener("change", function (e) {
+        var input = e.target;
+        if (!input || input.type !== "file" || !input.files || !input.files.length) return;
+
+        var target = findTarget(input);
+        if (!target || !window.fetch || !window.FormData) return;
+        if (!window.dash_clientside || !window.dash_clientside.set_props) return;
+
+        // On court-circuite la lecture base64 de dcc.Upload
+        e.stopPropagation();
+
+        var form = new FormData();
+        var count = target.multiple ? input.files.length : 1;
+        for (var i = 0; i < count; i++) {
+            form.append("file", input.files[i], input.files[i].name);
+        }
+        var toggle = target.append && document.getElementById(target.append);
+        if (toggle && toggle.checked) form.append("append", "1");
+        input.value = "";
+
+        fetch("/api/upload/" + target.kind, {method: "POST", body: form})
+            .then(function (resp) { return resp.json(); })
+            .then(function (payload) { setResult(target, payload); })
+            .catch(function (err) { setResult(target, {error: String(err)}); });
+    }, true);
+})();
@@ -1,49 +1,100 @@
 import base64
 import io
 import os
-import tempfile
 import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-import plotly.io as pio
-import plotly as _plotly
 from datetime import datetime
-from dash import Input, Output, State, html, dcc, callback_context, no_update
+from dash import Input, Output, State, ClientsideFunction, html, dcc, dash_table, callback_context, no_update
+from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
 
 from components.attrakdiff_layout import ATTRAKDIFF_ITEMS, DIM_COLORS, DIM_LABELS
-
-# Fix kaleido — initialisation au niveau module
-_plotlyjs = os.path.join(os.path.dirname(_plotly.__file__), 'package_data', 'plotly.min.js')
-if os.path.exists(_plotlyjs):
-    pio.kaleido.scope.plotlyjs = _plotlyjs
+from components.cache import get_dataset, store_dataset
+from components.ingest import read_csv, read_excel
+from components.jobs import heavy_job, job_options
+from components.pdf_api import publish_pdf
+from components.renderer import submit_png
+from components.table_query import PAGE_SIZE, table_columns, table_page
 
 
 # ============================================================
 # HELPERS — parsing & scoring
 # ============================================================
 
+ITEM_COLUMNS = [f"item_{item_id}" for item_id, _, _, _ in ATTRAKDIFF_ITEMS]
+
+
+def attrakdiff_excel_columns(header):
+    """Seules les colonnes item_1..item_28 sont chargées depuis l'Excel."""
+    return [i for i, name in enumerate(header) if name in ITEM_COLUMNS]
+
+
+def read_file(fileobj, filename):
+    if filename.lower().endswith(".csv"):
+        return read_csv(fileobj)
+    if filename.lower().endswith(".xlsx"):
+        return read_excel(fileobj, select=attrakdiff_excel_columns)
+    return pd.read_excel(fileobj)
+
+
 def parse_file(contents, filename):
     _, content_string = contents.split(",")
     decoded = base64.b64decode(content_string)
     try:
-        if filename.lower().endswith(".csv"):
-            df = pd.read_csv(io.StringIO(decoded.decode("utf-8")))
-        else:
-            df = pd.read_excel(io.BytesIO(decoded))
-        return df, None
+        return read_file(io.BytesIO(decoded), filename), None
     except Exception as e:
         return None, str(e)
 
 
+DIMENSIONS = ["PQ", "HQ-S", "HQ-I", "ATT"]
+
+# Matrice (28, 4) d'appartenance item → dimension, dans l'ordre ITEM_COLUMNS
+DIM_MATRIX = np.array([[1.0 if dim == d else 0.0 for d in DIMENSIONS]
+                       for _, _, _, dim in ATTRAKDIFF_ITEMS])
+
+# Quantiles t de Student à 97,5 % (IC 95 %) — au-delà de 30 ddl : loi normale
+T_975 = [12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+         2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+         2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042]
+
+
+def respondent_scores(df):
+    """Matrice (n, 4) des scores PQ / HQ-S / HQ-I / ATT par participant (–3 → +3)."""
+    items = np.clip(df.reindex(columns=ITEM_COLUMNS).to_numpy(dtype=float), 1, 7)
+    valid = ~np.isnan(items)
+    sums = np.where(valid, items, 0.0) @ DIM_MATRIX
+    counts = valid.astype(float) @ DIM_MATRIX
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / counts - 4
+
+
+def _describe(values):
+    values = values[~np.isnan(values)]
+    n = len(values)
+    if n == 0:
+        return {"mean": None, "std": None, "ci": None, "n": 0}
+    mean = float(values.mean())
+    std = float(values.std(ddof=1)) if n > 1 else 0.0
+    t = T_975[n - 2] if 1 < n <= len(T_975) + 1 else 1.96
+    half = t * std / np.sqrt(n)
+    return {"mean": round(mean, 3), "std": round(std, 3),
+            "ci": [round(float(mean - half), 3), round(float(mean + half), 3)], "n": n}
+
+
 def compute_scores(df):
-    dim_vals = {d: [] for d in ["PQ", "HQ-S", "HQ-I", "ATT"]}
-    for item_id, _, _, dim in ATTRAKDIFF_ITEMS:
-        col = f"item_{item_id}"
-        if col in df.columns:
-            dim_vals[dim].append(df[col].clip(1, 7).mean())
-    return {dim: round(np.mean(vals) - 4, 3) if vals else None
-            for dim, vals in dim_vals.items()}
+    """
+    Scores AttrakDiff à partir des scores individuels.
+    Retourne (scores, stats) : scores = moyenne par dimension ;
+    stats = moyenne, écart-type et IC 95 % par dimension, plus HQ
+    (moyenne HQ-S / HQ-I de chaque participant) pour le portfolio.
+    """
+    dims = respondent_scores(df)
+    stats = {dim: _describe(dims[:, j]) for j, dim in enumerate(DIMENSIONS)}
+    with np.errstate(invalid="ignore"):
+        stats["HQ"] = _describe(np.nanmean(dims[:, 1:3], axis=1))
+    scores = {dim: stats[dim]["mean"] for dim in DIMENSIONS}
+    return scores, stats
 
 
 def make_sample_df(n=20):
@@ -64,9 +115,19 @@ def make_template_csv():
 # FIGURES
 # ============================================================
 
-def make_portfolio(scores):
+def _error_bar(stat, center):
+    if not stat or not stat.get("ci"):
+        return None
+    lo, hi = stat["ci"]
+    return dict(type="data", symmetric=False, array=[hi - center], arrayminus=[center - lo],
+                color="#E91E63", thickness=1.5, width=6)
+
+
+def make_portfolio(scores, stats=None):
     hq  = ((scores.get("HQ-S") or 0) + (scores.get("HQ-I") or 0)) / 2
     pq  = scores.get("PQ") or 0
+    if stats and stats.get("HQ", {}).get("mean") is not None:
+        hq = stats["HQ"]["mean"]
     fig = go.Figure()
     zones = [
         (-3, -3,  0,  0, "Inutile",         "#FFF9C4"),
@@ -84,6 +145,8 @@ def make_portfolio(scores):
     fig.add_vline(x=0, line_dash="dot", line_color="#bbb", line_width=1)
     fig.add_trace(go.Scatter(
         x=[hq], y=[pq], mode="markers+text",
+        error_x=_error_bar((stats or {}).get("HQ"), hq),
+        error_y=_error_bar((stats or {}).get("PQ"), pq),
         marker=dict(size=20, color="#E91E63", symbol="diamond", line=dict(color="white", width=2)),
         text=["Votre produit"], textposition="top center",
         textfont=dict(size=12, color="#E91E63"),
@@ -101,17 +164,22 @@ def make_portfolio(scores):
     return fig
 
 
-def make_radar(scores):
+def make_radar(scores, stats=None):
     dims   = ["PQ", "HQ-S", "HQ-I", "ATT"]
     labels = [DIM_LABELS[d] for d in dims]
     vals   = [scores.get(d) or 0 for d in dims]
     vals_n = [(v + 3) / 6 * 100 for v in vals]
+    hover  = [f"{v:+.2f}" for v in vals]
+    if stats:
+        hover = [f"{v:+.2f}  (IC 95 % : {stats[d]['ci'][0]:+.2f} ; {stats[d]['ci'][1]:+.2f})"
+                 if stats.get(d, {}).get("ci") else h
+                 for d, v, h in zip(dims, vals, hover)]
     fig = go.Figure(go.Scatterpolar(
         r=vals_n + [vals_n[0]], theta=labels + [labels[0]],
         fill="toself", fillcolor="rgba(33,150,243,0.15)",
         line=dict(color="#2196F3", width=2), mode="lines+markers",
         marker=dict(size=8, color=[DIM_COLORS[d] for d in dims] + [DIM_COLORS[dims[0]]]),
-        customdata=[f"{v:+.2f}" for v in vals] + [f"{vals[0]:+.2f}"],
+        customdata=hover + [hover[0]],
         hovertemplate="%{theta} : %{customdata}<extra></extra>",
         text=[f"{v:+.2f}" for v in vals] + [""], textposition="top center",
     ))
@@ -164,21 +232,19 @@ def make_profile(df):
 # PDF GENERATION
 # ============================================================
 
-def generate_pdf(scores, n_participants, ai_text=""):
+def generate_pdf(scores, n_participants, ai_text="", stats=None):
     from fpdf import FPDF
 
-    fig_portfolio = make_portfolio(scores)
-    fig_radar     = make_radar(scores)
+    fig_portfolio = make_portfolio(scores, stats)
+    fig_radar     = make_radar(scores, stats)
 
-    def fig_to_tmp(fig, width=700, height=420):
-        img_bytes = fig.to_image(format="png", width=width, height=height, scale=2)
-        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".png")
-        tmp.write(img_bytes)
-        tmp.close()
-        return tmp.name
+    # Les deux figures sont rendues en parallèle (components/renderer.py)
+    png_portfolio = submit_png(fig_portfolio, width=700, height=420, scale=2)
+    png_radar     = submit_png(fig_radar, width=500, height=400, scale=2)
 
-    path_portfolio = fig_to_tmp(fig_portfolio, 700, 420)
-    path_radar     = fig_to_tmp(fig_radar, 500, 400)
+    # PNG passés à FPDF en mémoire : aucun fichier temporaire
+    png_portfolio = io.BytesIO(png_portfolio.result())
+    png_radar     = io.BytesIO(png_radar.result())
 
     class PDF(FPDF):
         def header(self):
@@ -247,6 +313,16 @@ def generate_pdf(scores, n_participants, ai_text=""):
         pdf.set_font("Helvetica", "", 8)
         pdf.cell(col_w, 5, DIM_LABELS[dim], align="C")
 
+    if stats:
+        pdf.ln(5)
+        for dim in ["PQ", "HQ-S", "HQ-I", "ATT"]:
+            st = stats.get(dim) or {}
+            txt = (f"ET {st['std']:.2f} - IC95 [{st['ci'][0]:+.2f} ; {st['ci'][1]:+.2f}]"
+                   if st.get("ci") else "")
+            pdf.set_text_color(120, 120, 120)
+            pdf.set_font("Helvetica", "", 7)
+            pdf.cell(col_w, 4, txt, align="C")
+
     pdf.ln(10)
 
     hq_mean = ((scores.get("HQ-S") or 0) + (scores.get("HQ-I") or 0)) / 2
@@ -270,11 +346,11 @@ def generate_pdf(scores, n_participants, ai_text=""):
     pdf.set_font("Helvetica", "B", 13)
     pdf.set_text_color(33, 37, 41)
     pdf.cell(0, 8, "Diagramme Portfolio", ln=True)
-    pdf.image(path_portfolio, x=10, w=120)
+    pdf.image(png_portfolio, x=10, w=120)
     pdf.ln(4)
 
     pdf.cell(0, 8, "Vue Radar", ln=True)
-    pdf.image(path_radar, x=35, w=90)
+    pdf.image(png_radar, x=35, w=90)
     pdf.ln(4)
 
     pdf.add_page()
@@ -310,15 +386,13 @@ def generate_pdf(scores, n_participants, ai_text=""):
         for line in ai_text.split("\n"):
             if line.startswith("#### "):
                 pdf.set_font("Helvetica", "B", 11)
-                pdf.multi_cell(0, 6, line.replace("#### ", ""))
+                pdf.multi_cell(0, 6, line.replace("#### ", ""), new_x="LMARGIN", new_y="NEXT")
                 pdf.set_font("Helvetica", "", 10)
             elif line.strip() == "":
                 pdf.ln(2)
             else:
-                pdf.multi_cell(0, 5, line)
+                pdf.multi_cell(0, 5, line, new_x="LMARGIN", new_y="NEXT")
 
-    os.unlink(path_portfolio)
-    os.unlink(path_radar)
     return bytes(pdf.output())
 
 
@@ -326,7 +400,7 @@ def generate_pdf(scores, n_participants, ai_text=""):
 # UI RÉSULTATS — Dashboard
 # ============================================================
 
-def make_score_cards(scores, n_participants):
+def make_score_cards(scores, n_participants, stats=None):
     def color(v):
         if v is None: return "#6c757d"
         if v >= 1:    return "#28a745"
@@ -342,6 +416,10 @@ def make_score_cards(scores, n_participants):
             html.H4(f"{scores[dim]:+.2f}" if scores[dim] is not None else "–",
                     style={"color": color(scores[dim]), "fontWeight": "700"}),
             html.Small(DIM_LABELS[dim], className="text-muted"),
+            html.Div(
+                f"IC 95 % [{stats[dim]['ci'][0]:+.2f} ; {stats[dim]['ci'][1]:+.2f}]",
+                className="text-muted small",
+            ) if stats and stats.get(dim, {}).get("ci") else None,
         ])], className="text-center h-100 shadow-sm"))
         for dim in ["PQ", "HQ-S", "HQ-I", "ATT"]
     ] + [
@@ -355,16 +433,36 @@ def make_score_cards(scores, n_participants):
     return dbc.Row(cols, className="g-3 mb-3")
 
 
-def make_dashboard_content(df, scores):
-    portfolio = make_portfolio(scores)
-    radar     = make_radar(scores)
+def make_data_table(df):
+    """Grille paginée côté serveur (cf. update_data_page) sur les 28 items."""
+    records, page_count = table_page(df, 0, PAGE_SIZE, columns=ITEM_COLUMNS)
+    return dash_table.DataTable(
+        id="attrakdiff-data-table",
+        data=records,
+        columns=table_columns(df, ITEM_COLUMNS, [f"Q{i}" for i in range(1, 29)]),
+        page_action="custom",
+        sort_action="custom",
+        sort_mode="single",
+        filter_action="custom",
+        page_current=0,
+        page_size=PAGE_SIZE,
+        page_count=page_count,
+        filter_query="",
+        style_table={"overflowX": "auto"},
+        style_cell={"textAlign": "center", "fontSize": "12px", "padding": "4px", "minWidth": "42px"},
+        style_header={"backgroundColor": "#f8f9fa", "fontWeight": "bold"},
+        style_data_conditional=[{"if": {"row_index": "odd"}, "backgroundColor": "#f9f9f9"}],
+    )
+
+
+def make_dashboard_content(df, scores, stats=None):
+    portfolio = make_portfolio(scores, stats)
+    radar     = make_radar(scores, stats)
     profile   = make_profile(df)
-    display_df = df[[f"item_{i}" for i in range(1, 29)]].copy()
-    display_df.columns = [f"Q{i}" for i in range(1, 29)]
 
     return html.Div([
         html.Hr(),
-        make_score_cards(scores, len(df)),
+        make_score_cards(scores, len(df), stats),
         dbc.Tabs([
             dbc.Tab(
                 dbc.Card(dbc.CardBody(dbc.Row([
@@ -381,10 +479,9 @@ def make_dashboard_content(df, scores):
             ),
             dbc.Tab(
                 dbc.Card(dbc.CardBody([
-                    html.P(f"{len(df)} participants - aperçu des 30 premières lignes",
+                    html.P(f"{len(df)} participants",
                            className="text-muted small mb-2"),
-                    dbc.Table.from_dataframe(display_df.head(30),
-                                             striped=True, hover=True, responsive=True, size="sm"),
+                    make_data_table(df),
                 ]), className="border-0"),
                 label="🔍 Données brutes", tab_id="tab-data",
             ),
@@ -403,76 +500,116 @@ def register_callbacks(app):
         Output("attrakdiff-results",       "children"),
         Output("attrakdiff-upload-status", "children"),
         Output("attrakdiff-store",         "data"),
+        Output("attrakdiff-ai-store",      "data", allow_duplicate=True),
         Input("attrakdiff-upload-btn",     "contents"),
         Input("attrakdiff-btn-sample",     "n_clicks"),
+        Input("attrakdiff-upload-result",  "data"),
         State("attrakdiff-upload-btn",     "filename"),
         prevent_initial_call=True,
     )
-    def handle_data(contents, n_sample, filename):
+    def handle_data(contents, n_sample, upload, filename):
         ctx = callback_context
         if not ctx.triggered:
-            return no_update, no_update, no_update
+            return no_update, no_update, no_update, no_update
         trigger = ctx.triggered[0]["prop_id"]
 
+        # Le store ne porte que scores / stats / effectif + handle du dataset
+        # (gardé côté serveur) ; le texte IA vit dans attrakdiff-ai-store
+
+        # Fichier déjà envoyé via /api/upload/attrakdiff (assets/upload.js)
+        df = None
+        if "upload-result" in trigger:
+            if not upload:
+                return no_update, no_update, no_update, no_update
+            if upload.get("error"):
+                return no_update, dbc.Alert(f"Erreur de lecture : {upload['error']}", color="danger"), no_update, no_update
+            filename = upload.get("filename")
+            # Handle partagé entre sessions (empreinte du contenu) : lu sans être retiré
+            df = get_dataset(upload.get("handle"))
+            if df is None:
+                return no_update, dbc.Alert("Import expiré, merci de réimporter le fichier.",
+                                            color="warning", dismissable=True), no_update, no_update
+
         if "btn-sample" in trigger and n_sample:
             df     = make_sample_df(20)
-            scores = compute_scores(df)
-            store  = {"scores": scores, "df_json": df.to_json(), "n": len(df), "ai_text": ""}
+            scores, stats = compute_scores(df)
+            store  = {"scores": scores, "stats": stats, "n": len(df), "handle": store_dataset(df)}
             return (
-                make_dashboard_content(df, scores),
+                make_dashboard_content(df, scores, stats),
                 dbc.Alert([html.I(className="bi bi-check-circle me-2"),
                            "Fichier exemple chargé — 20 participants simulés."],
                           color="success", dismissable=True, className="mt-2"),
                 store,
+                "",     # nouvelle analyse IA à générer pour ce dataset
             )
 
-        if "upload" in trigger and contents and filename:
+        if df is None and "upload" in trigger and contents and filename:
             df, err = parse_file(contents, filename)
             if err:
-                return no_update, dbc.Alert(f"Erreur de lecture : {err}", color="danger"), no_update
+                return no_update, dbc.Alert(f"Erreur de lecture : {err}", color="danger"), no_update, no_update
 
+        if df is not None:
             missing = [f"item_{i}" for i in range(1, 29) if f"item_{i}" not in df.columns]
             if missing:
                 preview = ", ".join(missing[:6]) + ("…" if len(missing) > 6 else "")
                 return no_update, dbc.Alert(
                     [html.Strong("Colonnes manquantes : "), preview],
-                    color="warning", dismissable=True), no_update
+                    color="warning", dismissable=True), no_update, no_update
 
             for col in [f"item_{i}" for i in range(1, 29)]:
                 if col in df.columns and not df[col].between(1, 7).all():
                     return no_update, dbc.Alert(
                         f"La colonne {col} contient des valeurs hors de [1–7].",
-                        color="warning", dismissable=True), no_update
+                        color="warning", dismissable=True), no_update, no_update
 
-            scores = compute_scores(df)
-            store  = {"scores": scores, "df_json": df.to_json(), "n": len(df), "ai_text": ""}
+            scores, stats = compute_scores(df)
+            store  = {"scores": scores, "stats": stats, "n": len(df), "handle": store_dataset(df)}
             return (
-                make_dashboard_content(df, scores),
+                make_dashboard_content(df, scores, stats),
                 dbc.Alert([html.I(className="bi bi-check-circle me-2"),
                            f"{filename} importé — {len(df)} participants."],
                           color="success", dismissable=True, className="mt-2"),
                 store,
+                "",     # nouvelle analyse IA à générer pour ce dataset
             )
 
-        return no_update, no_update, no_update
+        return no_update, no_update, no_update, no_update
 
-    # ── 2. Onglets ────────────────────────────────────────────
+    # ── 1b. Données brutes : page / tri / filtre côté serveur ─
     @app.callback(
+        Output("attrakdiff-data-table", "data"),
+        Output("attrakdiff-data-table", "page_count"),
+        Output("attrakdiff-data-table", "page_current"),
+        Input("attrakdiff-data-table",  "page_current"),
+        Input("attrakdiff-data-table",  "page_size"),
+        Input("attrakdiff-data-table",  "sort_by"),
+        Input("attrakdiff-data-table",  "filter_query"),
+        State("attrakdiff-store",       "data"),
+        prevent_initial_call=True,
+    )
+    def update_data_page(page_current, page_size, sort_by, filter_query, store):
+        df = get_dataset((store or {}).get("handle"))
+        if df is None:
+            raise PreventUpdate
+        return table_page(df, page_current, page_size, sort_by, filter_query, columns=ITEM_COLUMNS)
+
+    # ── 2. Onglets ────────────────────────────────────────────
+    # Clientside (assets/clientside.js) : pas d'aller-retour serveur
+    app.clientside_callback(
+        ClientsideFunction(namespace="ux", function_name="attrakdiff_loaded"),
+        Output("attrakdiff-loaded",        "data"),
+        Input("attrakdiff-store",          "data"),
+    )
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="ux", function_name="show_tabs"),
         Output("attrakdiff-tab-dashboard", "style"),
         Output("attrakdiff-tab-details",   "style"),
         Output("attrakdiff-tab-ia",        "style"),
         Output("attrakdiff-tab-pdf",       "style"),
         Input("attrakdiff-tabs",           "active_tab"),
-        Input("attrakdiff-store",          "data"),
+        Input("attrakdiff-loaded",         "data"),
     )
-    def show_tabs(active, store):
-        is_loaded = store is not None and store.get("n", 0) > 0
-        return (
-            {"display": "block"} if active == "tab-dashboard" and is_loaded else {"display": "none"},
-            {"display": "block"} if active == "tab-details"   else {"display": "none"},
-            {"display": "block"} if active == "tab-ia"        else {"display": "none"},
-            {"display": "block"} if active == "tab-pdf"       else {"display": "none"},
-        )
 
     # ── 3. Téléchargement modèle CSV ──────────────────────────
     @app.callback(
@@ -490,6 +627,7 @@ def register_callbacks(app):
         Output("attrakdiff-results",       "children", allow_duplicate=True),
         Output("attrakdiff-upload-status", "children", allow_duplicate=True),
         Output("attrakdiff-store",         "data",     allow_duplicate=True),
+        Output("attrakdiff-ai-store",      "data",     allow_duplicate=True),
         Output("attrakdiff-tabs",          "active_tab"),
         Output("attrakdiff-ia-text",       "children"),
         Output("attrakdiff-pdf-preview",   "children"),
@@ -498,31 +636,34 @@ def register_callbacks(app):
         prevent_initial_call=True,
     )
     def reset_all(n):
-        return "", "", None, "tab-dashboard", "", "", ""
+        return "", "", None, "", "tab-dashboard", "", "", ""
 
     # ── 5. Modal Aide ─────────────────────────────────────────
-    @app.callback(
+    app.clientside_callback(
+        ClientsideFunction(namespace="ux", function_name="toggle"),
         Output("attrakdiff-modal-help", "is_open"),
         Input("attrakdiff-btn-help",    "n_clicks"),
         Input("attrakdiff-close-help",  "n_clicks"),
         State("attrakdiff-modal-help",  "is_open"),
         prevent_initial_call=True,
     )
-    def toggle_help(open_click, close_click, is_open):
-        return not is_open
 
     # ── 6. Analyse IA ─────────────────────────────────────────
     @app.callback(
         Output("attrakdiff-ia-text",   "children", allow_duplicate=True),
-        Output("attrakdiff-store",     "data",     allow_duplicate=True),
+        Output("attrakdiff-ai-store",  "data"),
         Input("attrakdiff-btn-ai-tab", "n_clicks"),
         State("attrakdiff-store",      "data"),
         prevent_initial_call=True,
+        **job_options("attrakdiff-ai-job", "attrakdiff-btn-ai-tab"),
     )
-    def generate_ai(n, store):
+    @heavy_job
+    def generate_ai(set_progress, n, store):
         if not n or not store:
             return no_update, no_update
 
+        set_progress((100, "Analyse IA en cours…"))
+
         scores = store.get("scores", {})
         n_part = store.get("n", 0)
 
@@ -568,8 +709,8 @@ Format : uniquement #### pour les titres, pas d'emojis, pas de tableaux.
                 [html.Strong("Erreur IA : "), str(e)],
                 color="danger"), no_update
 
-        updated_store = {**store, "ai_text": ai_text}
-        return ai_text, updated_store
+        # Seul le texte repart vers le navigateur, pas le store complet
+        return ai_text, ai_text
 
     # ── 7. Export PDF ─────────────────────────────────────────
     @app.callback(
@@ -577,26 +718,32 @@ Format : uniquement #### pour les titres, pas d'emojis, pas de tableaux.
         Output("attrakdiff-pdf-download-zone", "children", allow_duplicate=True),
         Input("attrakdiff-btn-pdf-tab",        "n_clicks"),
         State("attrakdiff-store",              "data"),
+        State("attrakdiff-ai-store",           "data"),
         prevent_initial_call=True,
+        **job_options("attrakdiff-pdf-job", "attrakdiff-btn-pdf-tab"),
     )
-    def generate_pdf_preview(n, store):
+    @heavy_job
+    def generate_pdf_preview(set_progress, n, store, ai_text):
         if not n or not store:
             return no_update, no_update
 
+        set_progress((30, "Construction du PDF…"))
+
         scores  = store.get("scores", {})
         n_part  = store.get("n", 0)
-        ai_text = store.get("ai_text", "")
+        ai_text = ai_text or ""
+        stats   = store.get("stats")
 
-        pdf_bytes = generate_pdf(scores, n_part, ai_text=ai_text)
-        b64 = base64.b64encode(pdf_bytes).decode("utf-8")
+        pdf_bytes = generate_pdf(scores, n_part, ai_text=ai_text, stats=stats)
+        url = publish_pdf(pdf_bytes, "rapport_attrakdiff.pdf")
 
         iframe = html.Iframe(
-            src=f"data:application/pdf;base64,{b64}",
+            src=url,
             style={"width": "100%", "height": "100%", "border": "none"}
         )
         download_button = html.A(
             dbc.Button("Télécharger le PDF", color="success"),
-            href=f"data:application/pdf;base64,{b64}",
+            href=f"{url}?download=1",
             download="rapport_attrakdiff.pdf",
             target="_blank"
         )
@@ -1,6 +1,8 @@
 from dash import html, dcc
 import dash_bootstrap_components as dbc
 
+from components.jobs import job_panel
+
 # ============================================================
 # AttrakDiff 2 — 28 paires d'adjectifs
 # Ordre : 7 PQ · 7 HQ-S · 7 HQ-I · 7 ATT
@@ -90,6 +92,7 @@ attrakdiff_ia_section = html.Div([
         color="primary",
         style={"padding": "3px 10px", "whiteSpace": "nowrap", "width": "200px", "marginBottom": "20px"}
     ),
+    job_panel("attrakdiff-ai-job"),
     html.P(
         "L'analyse ci-dessous est générée automatiquement par un modèle de "
         "langage avancé (OpenAI GPT-4o). Elle est produite en temps réel à "
@@ -125,6 +128,7 @@ attrakdiff_pdf_section = html.Div([
         color="primary",
         style={"marginBottom": "20px"}
     ),
+    job_panel("attrakdiff-pdf-job"),
     dcc.Loading(
         id="attrakdiff-loading-pdf",
         type="circle",
@@ -0,0 +1,268 @@
+import functools
+import hashlib
+import json
+import os
+import stat
+import tempfile
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import diskcache
+import numpy as np
+import pandas as pd
+
+
+# ============================================================
+# Cache mémoire LRU + TTL (propre à chaque worker)
+# ============================================================
+
+class TTLCache:
+    """
+    Cache LRU avec expiration glissante, borné en nombre d'entrées
+    (`maxsize`, None = sans limite) et/ou en mémoire (`maxbytes`, taille
+    de chaque valeur mesurée par `sizeof`). L'entrée la plus récente est
+    toujours conservée.
+    """
+
+    def __init__(self, maxsize=32, ttl=3600, maxbytes=None, sizeof=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof or len
+        self.nbytes = 0
+        self._sizes = {}
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        if key is None:
+            return default
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires, value = item
+            now = time.monotonic()
+            if expires < now:
+                self._drop(key)
+                return default
+            # Accès = entrée rafraîchie (LRU + TTL glissant)
+            self._data[key] = (now + self.ttl, value)
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        size = self.sizeof(value) if self.maxbytes is not None else 0
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._sizes[key] = size
+            self.nbytes += size
+            self._evict()
+
+    def pop(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                self._drop(key)
+        return default if item is None else item[1]
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        return len(self._data)
+
+    def _drop(self, key):
+        del self._data[key]
+        self.nbytes -= self._sizes.pop(key, 0)
+
+    def _over(self):
+        if self.maxsize is not None and len(self._data) > self.maxsize:
+            return True
+        return self.maxbytes is not None and self.nbytes > self.maxbytes
+
+    def _evict(self):
+        now = time.monotonic()
+        for key in [k for k, (exp, _) in self._data.items() if exp < now]:
+            self._drop(key)
+        while len(self._data) > 1 and self._over():
+            self._drop(next(iter(self._data)))
+
+
+# ============================================================
+# Cache partagé des tâches background (workers gunicorn + processus fils)
+# ============================================================
+# Un seul répertoire diskcache local : progression et résultats des
+# callbacks background, créneaux des tâches. Les octets des rapports n'y
+# passent pas (cf. renderer.py).
+
+_SHM = "/dev/shm"
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def private_dir(path):
+    """
+    Crée au besoin `path` en 0700 et vérifie qu'il est réservé à
+    l'utilisateur courant (pas un lien, pas de droits pour les autres).
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if hasattr(os, "getuid"):
+        st = os.lstat(path)
+        if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+            raise RuntimeError(f"Répertoire {path} non privé : supprimez-le ou changez RUNTIME_DIR")
+    return path
+
+
+def _default_runtime_dir():
+    # Un répertoire par utilisateur et par déploiement (chemin de l'app).
+    # Sous Linux dans /dev/shm : tmpfs, mémoire vive
+    base = _SHM if os.path.isdir(_SHM) else tempfile.gettempdir()
+    user = os.getuid() if hasattr(os, "getuid") else os.environ.get("USERNAME", "")
+    deployment = hashlib.sha1(_ROOT.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(base, f"alter-ux-{user}-{deployment}")
+
+
+# Clé et socket du processus de rendu, cache partagé
+RUNTIME_DIR = private_dir(os.environ.get("RUNTIME_DIR") or _default_runtime_dir())
+
+SHARED_CACHE_DIR = os.environ.get("SHARED_CACHE_DIR", os.path.join(RUNTIME_DIR, "cache"))
+SHARED_CACHE_MAX_BYTES = int(os.environ.get("SHARED_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+
+shared_cache = diskcache.Cache(
+    SHARED_CACHE_DIR,
+    size_limit=SHARED_CACHE_MAX_BYTES,
+    eviction_policy="least-recently-used",
+)
+
+
+# ============================================================
+# Registre des datasets — le navigateur ne garde qu'un handle
+# ============================================================
+
+DATASET_TTL = 2 * 3600      # secondes
+DATASET_MAX_ENTRIES = 16    # caches dérivés (agrégats, résumés, vues)
+
+# Registre borné par la mémoire occupée, pas par le nombre de datasets :
+# un gros import ne chasse pas seul quinze petits, et inversement
+DATASET_MAX_BYTES = int(os.environ.get("DATASET_MAX_BYTES", 512 * 1024 * 1024))
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    """Mémoire occupée par un DataFrame (chaînes comprises)."""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+_datasets = TTLCache(maxsize=None, ttl=DATASET_TTL, maxbytes=DATASET_MAX_BYTES, sizeof=frame_nbytes)
+
+
+# Empreintes déjà calculées, par objet DataFrame vivant (id -> (réf. faible, empreinte))
+_fingerprints = {}
+
+
+def dataset_fingerprint(df: pd.DataFrame) -> str:
+    """Empreinte courte du contenu (valeurs + en-têtes) d'un DataFrame."""
+    known = _fingerprints.get(id(df))
+    if known is not None and known[0]() is df:
+        return known[1]
+
+    h = hashlib.sha1()
+    h.update("\x1f".join(map(str, df.columns)).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    fingerprint = h.hexdigest()[:16]
+
+    # Les datasets du registre ne sont jamais modifiés en place : l'empreinte
+    # reste valable tant que l'objet vit
+    key = id(df)
+    _fingerprints[key] = (weakref.ref(df, lambda _: _fingerprints.pop(key, None)), fingerprint)
+    return fingerprint
+
+
+UPLOAD_HASH_BLOCK = 1024 * 1024
+
+
+def upload_digest(fileobj, salt="") -> str:
+    """
+    Empreinte SHA-1 des octets d'un fichier (objet binaire seekable), lu
+    par blocs : deux imports identiques ont la même empreinte. Le curseur
+    est restauré.
+    """
+    h = hashlib.sha1(salt.encode("utf-8"))
+    pos = fileobj.tell()
+    for block in iter(lambda: fileobj.read(UPLOAD_HASH_BLOCK), b""):
+        h.update(block)
+    fileobj.seek(pos)
+    return h.hexdigest()
+
+
+def store_dataset(df: pd.DataFrame) -> str:
+    """Enregistre le DataFrame côté serveur et retourne son handle."""
+    handle = dataset_fingerprint(df)
+    _datasets.set(handle, df)
+    return handle
+
+
+def get_dataset(handle):
+    """Retourne le DataFrame associé au handle, ou None s'il a expiré."""
+    if not isinstance(handle, str):
+        return None
+    return _datasets.get(handle)
+
+
+# ============================================================
+# Mémoïsation des figures (dataset, constructeur, paramètres)
+# ============================================================
+
+FIGURE_MAX_ENTRIES = 128
+
+_figures = TTLCache(maxsize=FIGURE_MAX_ENTRIES, ttl=DATASET_TTL)
+
+
+def _figure_key_part(value):
+    if isinstance(value, pd.DataFrame):
+        return ("df", dataset_fingerprint(value))
+    if isinstance(value, (np.ndarray, pd.Series)):
+        return tuple(np.asarray(value).tolist())
+    return value
+
+
+def memoize_figure(builder):
+    """
+    Décorateur des constructeurs de charts.py : la figure est mise en cache
+    par (empreinte du dataset, constructeur, paramètres). La figure retournée
+    est partagée : ne pas la modifier en place.
+    """
+    @functools.wraps(builder)
+    def wrapper(*args, **kwargs):
+        key = (
+            builder.__qualname__,
+            tuple(_figure_key_part(a) for a in args),
+            tuple(sorted((k, _figure_key_part(v)) for k, v in kwargs.items())),
+        )
+        try:
+            hash(key)
+        except TypeError:
+            return builder(*args, **kwargs)
+
+        fig = _figures.get(key)
+        if fig is None:
+            fig = builder(*args, **kwargs)
+            _figures.set(key, fig)
+        return fig
+
+    return wrapper
+
+
+# ============================================================
+# Empreinte de contenu (clés des rendus PNG / PDF)
+# ============================================================
+
+def content_hash(value) -> str:
+    """Empreinte SHA-1 d'une valeur sérialisable en JSON (figures numpy comprises)."""
+    from plotly.utils import PlotlyJSONEncoder
+
+    payload = json.dumps(value, sort_keys=True, cls=PlotlyJSONEncoder)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
@@ -1,12 +1,20 @@
+import os
+
 import plotly.graph_objects as go
 import plotly.express as px
 import plotly.io as pio
 import pandas as pd
 import numpy as np
 
+from components.cache import memoize_figure
+
 # 🔥 FIX GLOBAL — éviter les erreurs de template Plotly (pattern shape)
 pio.templates.default = "plotly"
 
+# ⚡ Figures construites en dictionnaires (sans validation Plotly), même
+# sortie JSON que les versions go.Figure — FAST_FIGURES=0 pour les désactiver
+FAST_FIGURES = os.environ.get("FAST_FIGURES", "1") != "0"
+
 CATEGORY_COLOR_LIST = [
     "#2980b9",  # bleu
     "#27ae60",  # vert
@@ -28,6 +36,16 @@ def get_zone_color(score, zones):
 # 🚫 Figure vide (utilisée quand pas de données)
 # ======================================================
 def empty_fig():
+    if FAST_FIGURES:
+        return _figure_dict([], {
+            "xaxis": {"visible": False},
+            "yaxis": {"visible": False},
+            "plot_bgcolor": "white",
+            "paper_bgcolor": "white",
+            "margin": {"l": 0, "r": 0, "t": 0, "b": 0},
+            "height": 250,
+        })
+
     f = go.Figure()
     f.update_layout(
         xaxis={'visible': False},
@@ -40,20 +58,27 @@ def empty_fig():
     return f
 
 
+# Bornes exactes Bangor 2009 + lettres
+GAUGE_ZONES = [
+    (0, 25,  "#FF0000", "Pire<br>imaginable",          "F"),
+    (25, 51, "#f0ad4e", "Mauvais",                      "D"),
+    (51, 68, "#f7ec13", "Acceptable",                   "C"),
+    (68, 80, "#5bc0de", "Bon",                          "B"),
+    (80, 84, "#5cb85c", "Excellent",                    "A"),
+    (84, 100,"#3c763d", "Meilleur<br>imaginable",       "A+"),
+]
+GAUGE_TICKS = [0, 25, 51, 68, 80, 84, 100]
+
+
 # ======================================================
 # 1️⃣ Jauge principale SUS (Bangor 2009 + Grades A–F)
 # ======================================================
+@memoize_figure
 def create_gauge_native(score: float):
+    if FAST_FIGURES:
+        return _gauge_dict(score)
 
-    # Bornes exactes Bangor 2009 + lettres
-    zones = [
-        (0, 25,  "#FF0000", "Pire<br>imaginable",          "F"),
-        (25, 51, "#f0ad4e", "Mauvais",                      "D"),
-        (51, 68, "#f7ec13", "Acceptable",                   "C"),
-        (68, 80, "#5bc0de", "Bon",                          "B"),
-        (80, 84, "#5cb85c", "Excellent",                    "A"),
-        (84, 100,"#3c763d", "Meilleur<br>imaginable",       "A+"),
-    ]
+    zones = GAUGE_ZONES
 
     fig = go.Figure()
 
@@ -110,8 +135,7 @@ def create_gauge_native(score: float):
     # ------------------------------------------------------
     # Graduation
     # ------------------------------------------------------
-    ticks = [0, 25, 51, 68, 80, 84, 100]
-    for t in ticks:
+    for t in GAUGE_TICKS:
         fig.add_annotation(
             x=t, y=-0.6, text=str(t),
             showarrow=False,
@@ -143,17 +167,60 @@ def create_gauge_native(score: float):
 # ======================================================
 # 3️⃣ Histogramme principal SUS
 # ======================================================
+# Largeurs de classes possibles : les scores sont des multiples de 2,5
+HIST_BIN_STEPS = [2.5, 5, 10, 20]
+
+
+def histogram_bins(scores, nbins=20):
+    """
+    Regroupe les scores en ~nbins classes [a, b[ (dernière fermée) de
+    largeur « ronde ». Retourne (bords, effectifs) : taille fixe quel que
+    soit le nombre de réponses.
+    """
+    scores = scores[~np.isnan(scores)]
+    if scores.size == 0:
+        return np.array([0.0, 100.0]), np.array([0])
+
+    lo, hi = float(scores.min()), float(scores.max())
+    step = next((s for s in HIST_BIN_STEPS if s * nbins >= hi - lo), HIST_BIN_STEPS[-1])
+    start = np.floor(lo / step) * step
+    n = max(int(np.ceil((hi - start) / step)), 1)   # np.histogram ferme la dernière
+    edges = start + step * np.arange(n + 1)
+
+    counts, _ = np.histogram(scores, bins=edges)
+    return edges, counts
+
+
+def _histogram_parts(df):
+    """Moyenne, centres, largeurs, libellés et effectifs des classes."""
+    scores = df["SUS_Score"].to_numpy(dtype=float, na_value=np.nan)
+    mean_sus = float(np.nanmean(scores))
+
+    # Classes calculées côté serveur : la figure ne contient que les barres
+    edges, counts = histogram_bins(scores)
+    centers = (edges[:-1] + edges[1:]) / 2
+    ranges = [f"{a:g} – {b:g}" for a, b in zip(edges[:-1], edges[1:])]
+    return mean_sus, centers, np.diff(edges), ranges, counts
+
+
+@memoize_figure
 def create_main_histogram(df):
-    mean_sus = float(np.nanmean(df["SUS_Score"]))
-
-    fig = px.histogram(
-        df,
-        x="SUS_Score",
-        nbins=20,
-        title="Répartition des scores SUS",
-        color_discrete_sequence=["#2980b9"],
-        text_auto=True
-    )
+    if FAST_FIGURES:
+        return _main_histogram_dict(df)
+
+    mean_sus, centers, widths, ranges, counts = _histogram_parts(df)
+
+    fig = go.Figure(go.Bar(
+        x=centers,
+        y=counts,
+        width=widths,
+        customdata=ranges,
+        text=counts,
+        textposition="auto",
+        marker_color="#2980b9",
+        hovertemplate="Score SUS : %{customdata}<br>Réponses : %{y}<extra></extra>",
+    ))
+    fig.update_layout(title="Répartition des scores SUS", bargap=0)
 
     # Style des barres
     fig.update_traces(
@@ -207,7 +274,7 @@ def create_main_histogram(df):
 # ======================================================
 # 4️⃣ Radar
 # ======================================================
-def create_radar(df):
+def _radar_items(df):
     qcols = [
         c for c in df.columns
         if (not c.endswith("_adj"))
@@ -220,6 +287,15 @@ def create_radar(df):
 
     mean_items = df[qcols].mean(numeric_only=True).reset_index()
     mean_items.columns = ["Item", "Score"]
+    return mean_items
+
+
+@memoize_figure
+def create_radar(df):
+    if FAST_FIGURES:
+        return _radar_dict(df)
+
+    mean_items = _radar_items(df)
 
     fig = px.line_polar(
         mean_items,
@@ -266,6 +342,7 @@ def create_radar(df):
 # ======================================================
 # 5️⃣ Histogrammes par catégorie
 # ======================================================
+@memoize_figure
 def create_category_hist(df, col, idx):
 
     if df[col].dropna().empty:
@@ -287,7 +364,7 @@ def create_category_hist(df, col, idx):
         group_field = col
 
     grouped = (
-        df_cat.groupby(group_field, dropna=True)["SUS_Score"]
+        df_cat.groupby(group_field, dropna=True, observed=True)["SUS_Score"]
             .mean()
             .reset_index()
             .sort_values(group_field)
@@ -389,21 +466,34 @@ def compute_sus_stats(df):
 # ======================================================
 # 7️⃣ Histogramme par classe
 # ======================================================
-def create_sus_class_histogram(df, score_col="SUS_Score"):
-    bins = [0, 25, 51, 68, 80, 84, 100]
-    labels = [
-        "Pire<br>imaginable",
-        "Mauvais",
-        "Acceptable",
-        "Bon",
-        "Excellent",
-        "Meilleur<br>imaginable"
-    ]
-    colors = ["#FF0000", "#f0ad4e", "#f7ec13", "#5bc0de", "#5cb85c", "#3c763d"]
+CLASS_LABELS = [
+    "Pire<br>imaginable",
+    "Mauvais",
+    "Acceptable",
+    "Bon",
+    "Excellent",
+    "Meilleur<br>imaginable"
+]
+CLASS_COLORS = ["#FF0000", "#f0ad4e", "#f7ec13", "#5bc0de", "#5cb85c", "#3c763d"]
+
+
+def _class_counts(df, score_col, counts):
+    # Effectifs par classe déjà connus (agrégats) : pas de re-découpage
+    if counts is None:
+        bins = [0, 25, 51, 68, 80, 84, 100]
+        df = df.copy()
+        df["Classe SUS"] = pd.cut(df[score_col], bins=bins, labels=CLASS_LABELS, right=False)
+        counts = df["Classe SUS"].value_counts().reindex(CLASS_LABELS, fill_value=0)
+    return pd.Series(counts, index=CLASS_LABELS).astype(int)
+
 
-    df = df.copy()
-    df["Classe SUS"] = pd.cut(df[score_col], bins=bins, labels=labels, right=False)
-    counts = df["Classe SUS"].value_counts().reindex(labels, fill_value=0)
+@memoize_figure
+def create_sus_class_histogram(df, score_col="SUS_Score", counts=None):
+    if FAST_FIGURES:
+        return _class_histogram_dict(df, score_col, counts)
+
+    labels, colors = CLASS_LABELS, CLASS_COLORS
+    counts = _class_counts(df, score_col, counts)
 
     fig = go.Figure()
     for label, count, color in zip(labels, counts, colors):
@@ -447,20 +537,25 @@ def create_sus_class_histogram(df, score_col="SUS_Score"):
 from plotly.subplots import make_subplots
 
 
-def create_category_combined(df, col, idx):
-
+def category_labels(df, col):
+    """
+    Groupe de chaque répondant pour la colonne `col` (intervalles de
+    quantiles si numérique). Index : lignes où `col` et SUS_Score sont
+    renseignés. None si rien à grouper.
+    """
     if df[col].dropna().empty:
-        return empty_fig()
+        return None
 
-    df_cat = df[[col, "SUS_Score"]].dropna()
+    # Sélection par masque : `col` peut être SUS_Score lui-même
+    values = df.loc[df[col].notna() & df["SUS_Score"].notna(), col]
 
     # ======================================================
     # 🎯 1. Détecter si numérique
     # ======================================================
-    if pd.api.types.is_numeric_dtype(df_cat[col]):
+    if pd.api.types.is_numeric_dtype(values):
 
         # Nombre de groupes optimal : 4 à 8 selon la taille
-        n = len(df_cat)
+        n = len(values)
         if n < 20:
             q = 4
         elif n < 100:
@@ -470,41 +565,70 @@ def create_category_combined(df, col, idx):
 
         # Essayer qcut (quantiles)
         try:
-            df_cat["group"] = pd.qcut(df_cat[col], q=q, duplicates="drop")
+            return pd.qcut(values, q=q, duplicates="drop")
         except:
             # fallback à des intervalles réguliers
-            df_cat["group"] = pd.cut(df_cat[col], bins=q)
+            return pd.cut(values, bins=q)
 
-        group_field = "group"
+    # Catégorie textuelle simple
+    return values
 
-    else:
-        # Catégorie textuelle simple
-        group_field = col
+
+def group_label(x):
+    """Libellé affiché d'un groupe (intervalles sans décimales)."""
+    if isinstance(x, pd.Interval):
+        left = int(round(x.left))
+        right = int(round(x.right))
+        return f"{left}–{right}"
+    return str(x)
+
+
+def category_groups(df, col):
+    """
+    Moyenne SUS + effectif par groupe de la colonne `col` (quantiles si
+    numérique). Colonnes : group, SUS_mean, count. None si rien à tracer.
+    """
+    labels = category_labels(df, col)
+    if labels is None:
+        return None
+
+    # Scores stockés en float32 : moyennes calculées en float64
+    df_cat = pd.DataFrame({
+        "group": labels,
+        "SUS_Score": df.loc[labels.index, "SUS_Score"].astype(float),
+    })
 
     # ======================================================
     # 🎯 2. Statistiques : moyenne SUS + effectifs
     # ======================================================
     grouped = (
-        df_cat.groupby(group_field)
+        df_cat.groupby("group", observed=True)
               .agg(SUS_mean=("SUS_Score", "mean"),
-                   count=(col, "size"))
+                   count=("group", "size"))
               .reset_index()
     )
 
     # --- Nettoyage des labels pour affichage sans décimales ---
-    if pd.api.types.is_numeric_dtype(df_cat[col]):
-        def clean_interval(x):
-            if isinstance(x, pd.Interval):
-                left = int(round(x.left))
-                right = int(round(x.right))
-                return f"{left}–{right}"
-            return str(x)
+    if pd.api.types.is_numeric_dtype(df[col]):
+        grouped["group"] = grouped["group"].apply(group_label)
+
+        if grouped.empty:
+            return None
 
-        grouped[group_field] = grouped[group_field].apply(clean_interval)
+    return grouped
 
 
-        if grouped.empty:
-            return empty_fig()
+@memoize_figure
+def create_category_combined(df, col, idx, grouped=None):
+    """`grouped` : résultat de category_groups déjà calculé (résumé du dataset)."""
+    if grouped is None:
+        grouped = category_groups(df, col)
+    if FAST_FIGURES:
+        return _category_combined_dict(col, idx, grouped)
+
+    if grouped is None:
+        return empty_fig()
+    labels = grouped["group"].astype(str)
 
     color = CATEGORY_COLOR_LIST[idx % len(CATEGORY_COLOR_LIST)]
     safe_title = str(col)
@@ -516,7 +640,7 @@ def create_category_combined(df, col, idx):
     # ======================================================
     fig.add_trace(
         go.Bar(
-            x=grouped[group_field].astype(str),
+            x=labels,
             y=grouped["SUS_mean"],
             marker_color=color,
             marker_line_color="white",
@@ -534,7 +658,7 @@ def create_category_combined(df, col, idx):
     # ======================================================
     fig.add_trace(
         go.Bar(
-            x=grouped[group_field].astype(str),
+            x=labels,
             y=grouped["count"],
             marker_color="#7f8c8d",
             opacity=1,
@@ -567,3 +691,234 @@ def create_category_combined(df, col, idx):
     )
 
     return fig
+
+
+
+# ======================================================
+# ⚡ Mode rapide — figures en dictionnaires
+# ======================================================
+# Mêmes traces et layout que les versions go.Figure ci-dessus (sortie
+# JSON identique), sans l'instanciation/validation des objets Plotly.
+
+_template = None
+
+
+def _figure_dict(data, layout):
+    """Ajoute le template par défaut, comme go.Figure le fait à l'export."""
+    global _template
+    if _template is None:
+        _template = pio.templates[pio.templates.default].to_plotly_json()
+    layout["template"] = _template
+    return {"data": data, "layout": layout}
+
+
+def _gauge_dict(score):
+    shapes, annotations = [], []
+    for x0, x1, color, label, grade in GAUGE_ZONES:
+        shapes.append({
+            "type": "rect", "x0": x0, "x1": x1, "y0": 0, "y1": 0.5,
+            "fillcolor": color, "line": {"width": 0},
+        })
+        annotations.append({
+            "x": (x0 + x1) / 2, "y": 0.74, "text": label, "showarrow": False,
+            "font": {"size": 11, "color": "black"}, "align": "center",
+        })
+        annotations.append({
+            "x": (x0 + x1) / 2, "y": 0.25, "text": f"<b>{grade}</b>", "showarrow": False,
+            "font": {"size": 14, "color": "#484646"}, "bgcolor": "rgba(255,255,255,0.9)",
+        })
+
+    needle_color = next(
+        (color for x0, x1, color, _, _ in GAUGE_ZONES if x0 <= score <= x1), "black"
+    )
+    shapes.append({
+        "type": "path",
+        "path": f"M {score-2} -0.25 L {score+2} -0.25 L {score} -0.05 Z",
+        "fillcolor": needle_color,
+        "line": {"color": "black", "width": 1},
+    })
+
+    for t in GAUGE_TICKS:
+        annotations.append({
+            "x": t, "y": -0.6, "text": str(t), "showarrow": False,
+            "font": {"size": 12, "color": "gray"},
+        })
+
+    return _figure_dict([], {
+        "shapes": shapes,
+        "annotations": annotations,
+        "xaxis": {"range": [0, 100], "visible": False},
+        "yaxis": {"range": [-0.8, 1.0], "visible": False},
+        "title": {
+            "text": "Score SUS — Échelle Bangor (2009)",
+            "x": 0.5, "y": 0.97, "xanchor": "center",
+            "font": {"size": 14, "color": "#666"},
+        },
+        "height": 180,
+        "margin": {"l": 20, "r": 20, "t": 45, "b": 0},
+        "plot_bgcolor": "white",
+        "paper_bgcolor": "white",
+        "showlegend": False,
+    })
+
+
+def _main_histogram_dict(df):
+    mean_sus, centers, widths, ranges, counts = _histogram_parts(df)
+
+    bar = {
+        "type": "bar",
+        "x": centers,
+        "y": counts,
+        "width": widths,
+        "customdata": ranges,
+        "text": counts,
+        "textposition": "auto",
+        "marker": {"color": "#2980b9", "line": {"color": "white", "width": 1.5}},
+        "opacity": 0.85,
+        "hovertemplate": "Score SUS : %{customdata}<br>Réponses : %{y}<extra></extra>",
+    }
+
+    return _figure_dict([bar], {
+        "title": {"text": "Répartition des scores SUS", "x": 0.5},
+        "bargap": 0,
+        "shapes": [{
+            "type": "line", "x0": mean_sus, "x1": mean_sus, "xref": "x",
+            "y0": 0, "y1": 1, "yref": "y domain",
+            "line": {"color": "#e74c3c", "dash": "dash", "width": 2},
+        }],
+        "annotations": [{
+            "x": mean_sus,
+            "text": f"Moyenne : {mean_sus:.1f}",
+            "showarrow": False,
+            "font": {"size": 13, "color": "red"},
+            "yanchor": "auto",
+            "bgcolor": "rgba(255,255,255,0.9)",
+        }],
+        "plot_bgcolor": "white",
+        "paper_bgcolor": "white",
+        "xaxis": {"title": {"text": "Score SUS"}, "gridcolor": "#eee"},
+        "yaxis": {"title": {"text": "Nombre de réponses"}, "gridcolor": "#eee", "automargin": True},
+        "font": {"size": 13},
+        "margin": {"l": 30, "r": 30, "t": 60, "b": 30},
+        "height": 400,
+    })
+
+
+def _radar_dict(df):
+    mean_items = _radar_items(df)
+
+    # line_close=True : le premier point est répété en fin de tracé
+    r = mean_items["Score"].tolist()
+    theta = mean_items["Item"].tolist()
+    trace = {
+        "type": "scatterpolar",
+        "r": r + r[:1],
+        "theta": theta + theta[:1],
+        "mode": "lines+markers",
+        "fill": "toself",
+        "line": {"color": "#2980b9", "dash": "solid"},
+        "marker": {"symbol": "circle", "size": 7},
+        "hovertemplate": "Score=%{r}<br>Item=%{theta}<extra></extra>",
+        "legendgroup": "",
+        "name": "",
+        "showlegend": False,
+        "subplot": "polar",
+    }
+
+    return _figure_dict([trace], {
+        "title": {
+            "text": "Moyenne par question (1-5)",
+            "x": 0.5,
+            "xanchor": "center",
+            "font": {"size": 20, "color": "#333"},
+            "pad": {"t": 20},
+        },
+        "polar": {
+            "domain": {"x": [0.0, 1.0], "y": [0.0, 1.0]},
+            "radialaxis": {"range": [1, 5], "dtick": 1, "showticklabels": True, "tickfont": {"size": 12}},
+            "angularaxis": {"direction": "clockwise", "rotation": 90, "tickfont": {"size": 12}},
+        },
+        "legend": {"tracegroupgap": 0},
+        "margin": {"l": 30, "r": 30, "t": 60, "b": 30},
+        "height": 400,
+    })
+
+
+def _class_histogram_dict(df, score_col, counts):
+    counts = _class_counts(df, score_col, counts)
+
+    data = [
+        {
+            "type": "bar",
+            "x": [label],
+            "y": [int(count)],
+            "marker": {"color": color},
+            "text": [str(count)],
+            "textposition": "outside",
+        }
+        for label, count, color in zip(CLASS_LABELS, counts, CLASS_COLORS)
+    ]
+
+    return _figure_dict(data, {
+        "title": {"text": "Répartition des scores SUS par classe", "x": 0.5},
+        "xaxis": {"tickangle": -45, "tickfont": {"size": 12}},
+        "yaxis": {
+            "title": {"text": "Nombre de répondants"},
+            "zeroline": True,
+            "tickfont": {"size": 12, "color": "white"},
+            "range": [0, counts.max() * 1.25],
+        },
+        "height": 420,
+        "margin": {"l": 30, "r": 30, "t": 80, "b": 30},
+        "plot_bgcolor": "white",
+        "paper_bgcolor": "white",
+        "showlegend": False,
+    })
+
+
+def _category_combined_dict(col, idx, grouped):
+    if grouped is None:
+        return empty_fig()
+
+    labels = grouped["group"].astype(str).tolist()
+    sus_mean = grouped["SUS_mean"].to_numpy()
+    count = grouped["count"].to_numpy()
+    color = CATEGORY_COLOR_LIST[idx % len(CATEGORY_COLOR_LIST)]
+
+    data = [
+        {
+            "type": "bar", "x": labels, "y": sus_mean,
+            "marker": {"color": color, "line": {"color": "white", "width": 1.2}},
+            "text": [f"{v:.1f}" for v in sus_mean],
+            "textposition": "outside",
+            "width": 0.75,
+            "opacity": 0.9,
+            "xaxis": "x", "yaxis": "y",
+        },
+        {
+            "type": "bar", "x": labels, "y": count,
+            "marker": {"color": "#7f8c8d"},
+            "opacity": 1,
+            "width": 0.45,
+            "text": count,
+            "textposition": "inside",
+            "textfont": {"color": "white", "size": 12},
+            "xaxis": "x", "yaxis": "y2",
+        },
+    ]
+
+    # Axes du make_subplots(secondary_y=True) d'origine
+    return _figure_dict(data, {
+        "xaxis": {"anchor": "y", "domain": [0.0, 0.94]},
+        "yaxis": {"anchor": "x", "domain": [0.0, 1.0], "range": [0, sus_mean.max() * 1.25], "visible": False},
+        "yaxis2": {"anchor": "x", "overlaying": "y", "side": "right", "range": [0, count.max() * 1.6], "visible": False},
+        "title": {"text": str(col), "x": 0.5, "font": {"size": 18, "color": "#333"}},
+        "plot_bgcolor": "white",
+        "paper_bgcolor": "white",
+        "barmode": "overlay",
+        "bargap": 0.20,
+        "margin": {"l": 20, "r": 20, "t": 60, "b": 60},
+        "height": 330,
+        "font": {"size": 14},
+        "showlegend": False,
+    })
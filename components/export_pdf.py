@@ -1,23 +1,15 @@
 from fpdf import FPDF
-import plotly.io as pio
-import plotly.graph_objects as go
 import pandas as pd
 import os
 import io
-import tempfile
 from datetime import datetime
 from PIL import Image
 
 
+from components.cache import content_hash, dataset_fingerprint
 from components.charts import create_category_combined
-
-import plotly.io as pio
-import plotly
-import os
-
-plotlyjs = os.path.join(os.path.dirname(plotly.__file__), 'package_data', 'plotly.min.js')
-if os.path.exists(plotlyjs):
-    pio.kaleido.scope.plotlyjs = plotlyjs
+from components.renderer import pdf_cache, render_pngs
+from components.sus_summary import get_summary, report_categories
 
 
 # ============================================================================
@@ -122,35 +114,14 @@ def draw_kpi(pdf, title, value, x, y, w=70, h=16, bg_color=(247, 247, 247)):
 
 
 # ============================================================================
-# Utilitaire : sauvegarde d'un fig Plotly en PNG + retour (path, w_img, h_img)
+# Utilitaire : PNG (en mémoire) + tailles
 # ============================================================================
-def save_fig_to_png(fig_obj, key, img_dir):
-    if fig_obj is None:
-        return None
-
-    if isinstance(fig_obj, dict):
-        fig_obj = go.Figure(fig_obj)
-
-    # Fix kaleido — chemin plotly.js
-    import plotly.io as pio
-    import plotly as _plotly
-    _plotlyjs = os.path.join(os.path.dirname(_plotly.__file__), 'package_data', 'plotly.min.js')
-    if os.path.exists(_plotlyjs):
-        pio.kaleido.scope.plotlyjs = _plotlyjs
-
-    # rendu léger (stable Render)
-    png_bytes = fig_obj.to_image(format="png")
-
-    file_name = f"{key}.png"
-    path = os.path.join(img_dir, file_name)
-
-    with open(path, "wb") as f:
-        f.write(png_bytes)
-
+def png_info(png_bytes):
+    """{data, w, h} : octets PNG et taille en pixels, sans fichier."""
     im = Image.open(io.BytesIO(png_bytes))
     w_img, h_img = im.size
 
-    return {"path": path, "w": w_img, "h": h_img}
+    return {"data": png_bytes, "w": w_img, "h": h_img}
 
 
 # ============================================================================
@@ -158,7 +129,7 @@ def save_fig_to_png(fig_obj, key, img_dir):
 # ============================================================================
 def draw_image_centered(pdf, img_info, x_zone, y_zone, max_w, max_h, shadow_offset=0.2, shadow_color=(200, 200, 200)):
     """
-    img_info : dict {path, w, h}
+    img_info : dict {data, w, h}
     x_zone, y_zone : coin haut-gauche de la zone
     max_w, max_h : taille max disponible
     shadow_offset : décalage pour l'ombre tout autour
@@ -167,7 +138,6 @@ def draw_image_centered(pdf, img_info, x_zone, y_zone, max_w, max_h, shadow_offs
     if not img_info:
         return
 
-    path = img_info["path"]
     w_img = img_info["w"]
     h_img = img_info["h"]
 
@@ -190,7 +160,7 @@ def draw_image_centered(pdf, img_info, x_zone, y_zone, max_w, max_h, shadow_offs
     pdf.rect(x_img - shadow_offset, y_img - shadow_offset, w_display + 2*shadow_offset, h_display + 2*shadow_offset, 'F')
 
     # Dessiner l'image principale au-dessus de l'ombre
-    pdf.image(path, x=x_img, y=y_img, w=w_display, h=h_display)  # Image principale
+    pdf.image(io.BytesIO(img_info["data"]), x=x_img, y=y_img, w=w_display, h=h_display)  # Image principale
 
 
 
@@ -198,39 +168,63 @@ def draw_image_centered(pdf, img_info, x_zone, y_zone, max_w, max_h, shadow_offs
 # ============================================================================
 # MAIN PDF GENERATOR
 # ============================================================================
-def generate_sus_pdf(df, figs, output_path, ai_text=None, stats_table=None):
+# Version de la mise en page : à incrémenter à chaque modification du
+# rapport, pour ne pas resservir un PDF mis en cache avec l'ancienne
+PDF_TEMPLATE_VERSION = 2
+
+
+def generate_sus_pdf(df, figs, ai_text=None, stats_table=None, progress=None, summary=None):
+    """
+    Rapport SUS complet, retourné en bytes. Mis en cache par (dataset,
+    figures + stats, texte IA, version du modèle) : l'aperçu puis le
+    téléchargement ne construisent le PDF qu'une fois. `progress(faits,
+    total)` suit le rendu des graphiques. `summary` : résumé du dataset
+    affiché (catégories du dashboard) ; par défaut celui de `df`.
+    """
+    if summary is None:
+        summary = get_summary(dataset_fingerprint(df), df)
+    key = (
+        dataset_fingerprint(df),
+        content_hash([figs, stats_table, summary.category_slots]),
+        content_hash(ai_text or ""),
+        PDF_TEMPLATE_VERSION,
+    )
+    pdf_bytes = pdf_cache.get(key)
+    if pdf_bytes is None:
+        pdf_bytes = _build_sus_pdf(df, figs, ai_text, stats_table, summary, progress)
+        pdf_cache.set(key, pdf_bytes)
+    return pdf_bytes
+
+
+def _build_sus_pdf(df, figs, ai_text, stats_table, summary, progress=None):
+    """
+    Construction du rapport. Tout reste en mémoire (PNG et PDF) : aucun
+    fichier partagé entre deux exports simultanés.
+    """
 
     # ------------------------------------------------------------------------
     # 1) Export des figures → PNG + tailles
     #    figs contient : gauge, accept, hist, radar, class
     # ------------------------------------------------------------------------
-    img_dir = os.path.join(tempfile.gettempdir(), "sus_temp_images")
-    os.makedirs(img_dir, exist_ok=True)
-
     img_infos = {}
 
-    # Graphes principaux venant du fig-store
-    for key in ["gauge", "hist", "radar", "class"]:
-        fig_obj = figs.get(key) if isinstance(figs, dict) else None
-        if fig_obj is not None:
-            info = save_fig_to_png(fig_obj, key, img_dir)
-            if info:
-                img_infos[key] = info
-
     # ------------------------------------------------------------------------
-    # 2) Génération des graphes catégories (comme dans l'app)
-    #    Colonnes 11:15 comme dans update_categories
+    # 2) Catégories du dashboard : mêmes emplacements, mêmes groupes, donc
+    #    mêmes figures mémoïsées (page 3 seulement s'il en reste au moins une)
     # ------------------------------------------------------------------------
-    extra_cols = df.columns[11:15]
-    cat_keys = []
+    categories = report_categories(df, summary)
+    valid_categories = [col for _, col, _ in categories]
 
-    for i, col in enumerate(extra_cols):
-        fig_cat = create_category_combined(df, col, i)
-        key = f"cat{i+1}"
-        cat_keys.append(key)
-        info = save_fig_to_png(fig_cat, key, img_dir)
-        if info:
-            img_infos[key] = info
+    # Graphes principaux venant du fig-store + graphes catégories :
+    # un seul lot, rendu en parallèle
+    batch = {
+        key: figs.get(key) for key in ["gauge", "hist", "radar", "class"]
+    } if isinstance(figs, dict) else {}
+    for n, (i, col, grouped) in enumerate(categories, start=1):
+        batch[f"cat{n}"] = create_category_combined(df, col, i, grouped)
+
+    for key, png_bytes in render_pngs(batch, progress=progress).items():
+        img_infos[key] = png_info(png_bytes)
 
     # ------------------------------------------------------------------------
     # 3) Création PDF (paysage)
@@ -369,32 +363,7 @@ def generate_sus_pdf(df, figs, output_path, ai_text=None, stats_table=None):
     # ========================================================================
 
     # ------------------------------------------------------------
-    # 1. Détection des catégories comme dans l'app
-    # ------------------------------------------------------------
-    cols = list(df.columns)
-
-    try:
-        q10_index = cols.index("Q10")
-        raw_cat_cols = cols[q10_index + 1 : q10_index + 5]
-    except ValueError:
-        raw_cat_cols = []
-
-    valid_categories = []
-
-    for col in raw_cat_cols:
-        # Exclure colonnes _adj
-        if col.endswith("_adj"):
-            continue
-        # Exclure colonnes vides
-        if df[col].dropna().empty:
-            continue
-        valid_categories.append(col)
-
-    # Garder max 4
-    valid_categories = valid_categories[:4]
-
-    # ------------------------------------------------------------
-    # 2. Si aucune catégorie → NE PAS créer la page
+    # 1. Si aucune catégorie → NE PAS créer la page
     # ------------------------------------------------------------
     if len(valid_categories) == 0:
         # Rien du tout : on ne crée aucune page 3
@@ -402,17 +371,7 @@ def generate_sus_pdf(df, figs, output_path, ai_text=None, stats_table=None):
 
     else:
         # --------------------------------------------------------
-        # 3. Générer uniquement les figures valides
-        # --------------------------------------------------------
-        for i, col in enumerate(valid_categories):
-            fig_cat = create_category_combined(df, col, i)
-            key = f"cat{i+1}"
-            info = save_fig_to_png(fig_cat, key, img_dir)
-            if info:
-                img_infos[key] = info
-
-        # --------------------------------------------------------
-        # 4. Affichage sur une page 3 (2×2 max)
+        # 2. Affichage sur une page 3 (2×2 max)
         # --------------------------------------------------------
         pdf.add_page()
         pdf.ln(1)
@@ -512,14 +471,4 @@ def generate_sus_pdf(df, figs, output_path, ai_text=None, stats_table=None):
     else:
         write_paragraph("Aucune analyse IA n’a été générée.")
 
-    # ========================================================================
-    # CLEAN TEMP FILES
-    # ========================================================================
-    for info in img_infos.values():
-        try:
-            os.remove(info["path"])
-        except Exception:
-            pass
-
-    pdf.output(output_path)
-    return output_path
+    return bytes(pdf.output())
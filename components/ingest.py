@@ -0,0 +1,138 @@
+import codecs
+import csv
+import re
+
+import pandas as pd
+
+
+# ============================================================
+# Détection du format CSV (séparateur, encodage, décimale)
+# ============================================================
+
+SNIFF_BYTES = 64 * 1024
+SNIFF_LINES = 50
+CANDIDATE_SEPS = [",", ";", "\t", "|"]
+
+_DECIMAL_COMMA = re.compile(r"^\s*-?\d+,\d+\s*$")
+_DECIMAL_POINT = re.compile(r"^\s*-?\d+\.\d+\s*$")
+
+
+def _sniff_encoding(head: bytes) -> str:
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        head.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError as e:
+        # Caractère multi-octets coupé en fin d'échantillon : reste de l'UTF-8
+        if e.start >= len(head) - 3 and e.reason == "unexpected end of data":
+            return "utf-8"
+        # Exports Excel « CSV (séparateur : point-virgule) » en français
+        return "cp1252"
+
+
+def _sniff_sep(lines):
+    best, best_score = ",", (0, 0)
+    for sep in CANDIDATE_SEPS:
+        counts = [len(row) for row in csv.reader(lines, delimiter=sep)]
+        if not counts or counts[0] < 2:
+            continue
+        # Nombre de lignes ayant autant de champs que l'en-tête, puis largeur
+        score = (sum(c == counts[0] for c in counts), counts[0])
+        if score > best_score:
+            best, best_score = sep, score
+    return best
+
+
+def _sniff_decimal(lines, sep):
+    if sep == ",":
+        return "."
+    comma = point = 0
+    for row in csv.reader(lines[1:], delimiter=sep):
+        for field in row:
+            if _DECIMAL_COMMA.match(field):
+                comma += 1
+            elif _DECIMAL_POINT.match(field):
+                point += 1
+    return "," if comma > point else "."
+
+
+def sniff_csv(fileobj) -> dict:
+    """
+    Analyse les premiers Ko d'un CSV (objet binaire seekable) et retourne
+    les options pandas : sep, encoding, decimal. Le curseur est restauré.
+    """
+    pos = fileobj.tell()
+    head = fileobj.read(SNIFF_BYTES)
+    fileobj.seek(pos)
+
+    encoding = _sniff_encoding(head)
+    lines = head.decode(encoding, errors="replace").splitlines()
+    if len(head) == SNIFF_BYTES and len(lines) > 1:
+        lines = lines[:-1]          # dernière ligne potentiellement tronquée
+    lines = lines[:SNIFF_LINES]
+
+    sep = _sniff_sep(lines)
+    return {"sep": sep, "encoding": encoding, "decimal": _sniff_decimal(lines, sep)}
+
+
+def read_csv(fileobj, **kwargs):
+    """Lecture CSV en une seule passe avec les options détectées."""
+    return pd.read_csv(fileobj, **sniff_csv(fileobj), **kwargs)
+
+
+# ============================================================
+# Lecture Excel rapide (1ère feuille, lecture seule, colonnes utiles)
+# ============================================================
+
+def _header_names(header):
+    """Noms de colonnes comme pandas : « Unnamed: i », doublons suffixés .1, .2…"""
+    names, seen = [], {}
+    for i, name in enumerate(header):
+        name = f"Unnamed: {i}" if name is None else name
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def read_excel(fileobj, select=None):
+    """
+    Lit la première feuille d'un .xlsx en mode streaming (openpyxl read-only).
+    `select(header)` retourne les indices des colonnes à charger, ou None pour
+    toutes : les autres cellules ne sont jamais converties en objets Python.
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(fileobj, read_only=True, data_only=True, keep_links=False)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return pd.DataFrame()
+
+        # Colonnes vides en fin d'en-tête (mise en forme Excel) ignorées
+        header = list(header)
+        while header and header[-1] is None:
+            header.pop()
+
+        keep = select(header) if select else None
+        if keep is None:
+            keep = range(len(header))
+        keep = [i for i in keep if i < len(header)]
+
+        data = []
+        for row in rows:
+            data.append([row[i] if i < len(row) else None for i in keep])
+    finally:
+        wb.close()
+
+    # Lignes vides en fin de feuille ignorées (comme pandas)
+    while data and all(v is None for v in data[-1]):
+        data.pop()
+
+    names = _header_names(header)
+    return pd.DataFrame(data, columns=[names[i] for i in keep])
@@ -0,0 +1,144 @@
+import functools
+import os
+import time
+from contextlib import contextmanager
+
+import dash_bootstrap_components as dbc
+import multiprocess
+import psutil
+from dash import DiskcacheManager, Input, Output, html
+
+from components.cache import shared_cache
+
+
+# ============================================================
+# ⏳ Tâches longues (PDF, IA) hors du worker gunicorn
+# ============================================================
+# Callbacks « background » Dash : chaque tâche tourne dans un processus
+# fils, progression et résultat passent par le cache partagé local
+# (cache.py, aucun broker ; Dash efface le résultat dès sa lecture). Le
+# worker répond aussitôt et reste libre pour les autres utilisateurs ; le
+# navigateur interroge l'avancement.
+
+# Nombre maximal de tâches lourdes simultanées, tous workers confondus
+MAX_HEAVY_JOBS = max(int(os.environ.get("MAX_HEAVY_JOBS", "2")), 1)
+
+SLOT_POLL_INTERVAL = 0.5    # secondes
+WAITING = (0, "En attente d'un créneau…")
+
+# Le fils lit le registre des datasets hérité du worker : fork obligatoire,
+# pour les tâches seulement (la méthode globale du processus est inchangée)
+_JOB_CONTEXT = multiprocess.get_context(
+    "fork" if "fork" in multiprocess.get_all_start_methods() else None
+)
+
+
+class ForkDiskcacheManager(DiskcacheManager):
+    """DiskcacheManager dont les tâches sont des processus _JOB_CONTEXT."""
+
+    def call_job_fn(self, key, job_fn, args, context):
+        process = _JOB_CONTEXT.Process(
+            target=job_fn,
+            args=(key, self._make_progress_key(key), args, context),
+        )
+        process.start()
+        return process.pid
+
+
+background_manager = ForkDiskcacheManager(shared_cache)
+
+_SLOTS_KEY = ("jobs", "slots")
+
+
+def _alive(pid):
+    try:
+        return psutil.Process(pid).status() != psutil.STATUS_ZOMBIE
+    except psutil.NoSuchProcess:
+        return False
+
+
+@contextmanager
+def heavy_slot(on_wait=None):
+    """
+    Réserve un des MAX_HEAVY_JOBS créneaux. Les créneaux de processus
+    disparus (tâche annulée = processus tué) sont récupérés. `on_wait` est
+    appelé une fois si la tâche doit attendre.
+    """
+    pid = os.getpid()
+    waiting = False
+    while True:
+        with shared_cache.transact():
+            running = [p for p in shared_cache.get(_SLOTS_KEY, []) if p != pid and _alive(p)]
+            if len(running) < MAX_HEAVY_JOBS:
+                shared_cache.set(_SLOTS_KEY, running + [pid])
+                break
+        if not waiting and on_wait is not None:
+            on_wait()
+        waiting = True
+        time.sleep(SLOT_POLL_INTERVAL)
+    try:
+        yield
+    finally:
+        with shared_cache.transact():
+            slots = shared_cache.get(_SLOTS_KEY, [])
+            shared_cache.set(_SLOTS_KEY, [p for p in slots if p != pid])
+
+
+def heavy_job(fn):
+    """
+    Décorateur des callbacks background lourds (premier argument :
+    set_progress, qui reçoit (valeur, libellé)). La tâche attend un
+    créneau libre ; ses rendus passent par le processus de rendu du worker.
+    """
+    @functools.wraps(fn)
+    def wrapper(set_progress, *args):
+        with heavy_slot(lambda: set_progress(WAITING)):
+            return fn(set_progress, *args)
+
+    return wrapper
+
+
+# ============================================================
+# Affichage : barre de progression + bouton Annuler
+# ============================================================
+
+PANEL_SHOWN = {"display": "flex", "alignItems": "center", "gap": "10px", "margin": "10px 0"}
+PANEL_HIDDEN = {"display": "none"}
+
+
+def job_panel(panel_id):
+    """Panneau visible pendant la tâche : progression et annulation."""
+    return html.Div(
+        [
+            dbc.Progress(
+                id=f"{panel_id}-progress",
+                value=100,
+                striped=True,
+                animated=True,
+                style={"flex": "1", "height": "22px"},
+            ),
+            dbc.Button("Annuler", id=f"{panel_id}-cancel", color="secondary", size="sm"),
+        ],
+        id=panel_id,
+        style=PANEL_HIDDEN,
+    )
+
+
+def job_options(panel_id, button_id):
+    """
+    Arguments d'un callback background affiché dans job_panel(panel_id) :
+    bouton désactivé et panneau visible pendant la tâche, progression
+    (valeur, libellé), annulation par le bouton du panneau.
+    """
+    return dict(
+        background=True,
+        running=[
+            (Output(button_id, "disabled"), True, False),
+            (Output(panel_id, "style"), PANEL_SHOWN, PANEL_HIDDEN),
+        ],
+        progress=[
+            Output(f"{panel_id}-progress", "value"),
+            Output(f"{panel_id}-progress", "label"),
+        ],
+        cancel=[Input(f"{panel_id}-cancel", "n_clicks")],
+    )
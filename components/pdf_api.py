@@ -0,0 +1,50 @@
+import io
+import secrets
+from urllib.parse import quote
+
+from flask import abort, request, send_file
+
+from components.renderer import RemoteCache
+
+
+# ============================================================
+# PDF générés servis par URL — évite les data URI base64
+# ============================================================
+# Le callback dépose les bytes du PDF sous un jeton aléatoire et ne renvoie
+# que l'URL : l'aperçu (Iframe) et le bouton de téléchargement lisent le
+# même fichier, servi par Flask (requêtes Range comprises). Jetons tenus en
+# mémoire par le processus de rendu : le PDF peut être construit par un
+# processus de tâche, et rien n'est écrit sur disque.
+
+PDF_TTL = 30 * 60              # secondes
+
+_pdfs = RemoteCache("pdf-token", ttl=PDF_TTL)
+
+
+def publish_pdf(pdf_bytes, filename):
+    """Dépose le PDF et retourne son URL (jeton valable PDF_TTL secondes)."""
+    token = secrets.token_urlsafe(16)
+    _pdfs.set(token, pdf_bytes)
+    return f"/api/pdf/{token}/{quote(filename)}"
+
+
+def register_routes(app):
+    server = app.server
+
+    @server.route("/api/pdf/<token>/<filename>", methods=["GET"])
+    def download_pdf(token, filename):
+        pdf_bytes = _pdfs.get(token)
+        if pdf_bytes is None:
+            abort(404)
+
+        # ?download=1 : pièce jointe ; sinon affichage dans l'Iframe
+        response = send_file(
+            io.BytesIO(pdf_bytes),
+            mimetype="application/pdf",
+            as_attachment=request.args.get("download") == "1",
+            download_name=filename,
+            conditional=True,
+            max_age=0,
+        )
+        response.headers["Cache-Control"] = "private, no-store"
+        return response
@@ -0,0 +1,441 @@
+import errno
+import json
+import logging
+import os
+import queue
+import secrets
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+import plotly
+import plotly.graph_objects as go
+import plotly.io as pio
+import psutil
+from plotly.utils import PlotlyJSONEncoder
+
+from components.cache import DATASET_TTL, RUNTIME_DIR, TTLCache, content_hash
+
+
+# ============================================================
+# 🖼️ Rendu PNG des figures — processus de rendu gardé chaud
+# ============================================================
+# Chaque instance kaleido est un processus Chromium : le démarrer coûte
+# ~1 s, un rendu ensuite ~0,1 s. Un seul processus de rendu par
+# déploiement, lancé au démarrage du worker (app.py), garde RENDER_WORKERS
+# instances chaudes pendant toute la vie du worker. Workers et tâches
+# background lui envoient leurs figures par un socket local ; un lot est
+# rendu en parallèle, une figure par instance libre.
+#
+# Le même processus tient en mémoire vive les PNG et PDF rendus et les PDF
+# servis par /api/pdf (RemoteCache) : aucun octet de rapport sur disque.
+#
+# Socket et clé dans RUNTIME_DIR (0700, cf. cache.py). Protocole : en-tête
+# JSON (opérations fixes) puis octets bruts — rien n'est désérialisé par
+# pickle.
+
+RENDER_WORKERS = max(int(os.environ.get("RENDER_WORKERS", "2")), 1)
+
+if sys.platform == "win32":
+    RENDER_ADDRESS = r"\\.\pipe\alter-ux-render-" + os.path.basename(RUNTIME_DIR)
+else:
+    RENDER_ADDRESS = os.path.join(RUNTIME_DIR, "render.sock")
+AUTHKEY_PATH = os.path.join(RUNTIME_DIR, "render.key")
+
+RENDER_START_TIMEOUT = 30   # secondes
+OWNER_POLL_INTERVAL = 2     # secondes
+MAX_MESSAGE_BYTES = 256 * 1024 * 1024
+
+# PNG / PDF gardés en mémoire par le processus de rendu (par cache)
+RENDER_CACHE_TTL = DATASET_TTL
+RENDER_CACHE_MAX_BYTES = int(os.environ.get("RENDER_CACHE_MAX_BYTES", 128 * 1024 * 1024))
+
+PLOTLYJS = os.path.join(os.path.dirname(plotly.__file__), "package_data", "plotly.min.js")
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_BLANK = {"data": [], "layout": {}}
+
+logger = logging.getLogger(__name__)
+
+# Processus qui garde le rendu en vie : le worker (hérité par ses tâches)
+_owner = os.getpid()
+_server = None
+_key = None
+_start_lock = threading.Lock()
+
+# Côté client : une connexion par thread de rendu
+_local = threading.local()
+_executor = None
+
+
+def _authkey():
+    """
+    Clé du déploiement : fichier 0600 de RUNTIME_DIR, écrit une fois
+    (lien atomique) et relu par chaque processus.
+    """
+    global _key
+    if _key is None:
+        if not os.path.exists(AUTHKEY_PATH):
+            tmp = f"{AUTHKEY_PATH}.{os.getpid()}"
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(secrets.token_bytes(32))
+            try:
+                os.link(tmp, AUTHKEY_PATH)
+            except FileExistsError:
+                pass
+            finally:
+                os.unlink(tmp)
+        with open(AUTHKEY_PATH, "rb") as f:
+            _key = f.read()
+    return _key
+
+
+def _open():
+    """Connexion authentifiée ; clé relue une fois si elle est refusée."""
+    global _key
+    try:
+        return Client(RENDER_ADDRESS, authkey=_authkey())
+    except AuthenticationError:
+        _key = None
+        return Client(RENDER_ADDRESS, authkey=_authkey())
+
+
+def _probe():
+    try:
+        _open().close()
+        return True
+    except (FileNotFoundError, ConnectionRefusedError):
+        return False
+    except AuthenticationError:
+        # Un processus écoute mais refuse la clé : ne pas en lancer un autre
+        logger.error("Clé refusée par le processus de rendu (%s)", RENDER_ADDRESS)
+        return True
+
+
+def start_renderers():
+    """
+    Lance le processus de rendu s'il ne tourne pas déjà (sans attendre le
+    démarrage de Chromium). À appeler au démarrage du worker.
+    """
+    global _server
+    with _start_lock:
+        if _server is not None and _server.poll() is None:
+            return
+        if _probe():
+            return
+        _server = subprocess.Popen(
+            [sys.executable, "-m", "components.renderer", str(_owner)],
+            cwd=_ROOT,
+        )
+
+
+def _connect():
+    try:
+        return _open()
+    except (FileNotFoundError, ConnectionRefusedError):
+        pass
+    # Processus de rendu absent (arrêté, ou worker propriétaire disparu)
+    start_renderers()
+    deadline = time.monotonic() + RENDER_START_TIMEOUT
+    while True:
+        try:
+            return _open()
+        except (FileNotFoundError, ConnectionRefusedError):
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def _exchange(conn, header, payload):
+    conn.send_bytes(json.dumps(header, cls=PlotlyJSONEncoder).encode("utf-8"))
+    if payload is not None:
+        conn.send_bytes(payload)
+    reply = json.loads(conn.recv_bytes(MAX_MESSAGE_BYTES))
+    if not reply["ok"]:
+        raise RuntimeError(reply["error"])
+    return conn.recv_bytes(MAX_MESSAGE_BYTES) if reply["found"] else None
+
+
+def _call(header, payload=None):
+    """
+    Requête au processus de rendu : en-tête JSON, octets éventuels (`set`).
+    Retourne les octets de la réponse, ou None.
+    """
+    for attempt in (1, 2):
+        conn = getattr(_local, "conn", None)
+        if conn is None:
+            conn = _local.conn = _connect()
+        try:
+            return _exchange(conn, header, payload)
+        except (EOFError, OSError):
+            # Processus de rendu redémarré : nouvelle connexion, une fois
+            _local.conn = None
+            if attempt == 2:
+                raise
+
+
+def _after_fork():
+    """Processus fils (tâche background) : ses propres connexions et threads."""
+    global _server, _local, _executor, _start_lock
+    _server = None
+    _local = threading.local()
+    _executor = None
+    _start_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+class RemoteCache:
+    """
+    Même interface que TTLCache (get / set / pop) pour des valeurs bytes,
+    tenue en mémoire par le processus de rendu : visible du worker et de
+    ses tâches. Clés sérialisables en JSON.
+    """
+
+    def __init__(self, name, ttl=RENDER_CACHE_TTL, maxbytes=RENDER_CACHE_MAX_BYTES):
+        self.name = name
+        self.ttl = ttl
+        self.maxbytes = maxbytes
+
+    def _header(self, op, key):
+        return {"op": op, "cache": self.name, "key": json.dumps(key)}
+
+    def get(self, key, default=None):
+        if key is None:
+            return default
+        value = _call(self._header("get", key))
+        return default if value is None else value
+
+    def set(self, key, value):
+        header = self._header("set", key)
+        header.update(ttl=self.ttl, maxbytes=self.maxbytes)
+        _call(header, bytes(value))
+
+    def pop(self, key, default=None):
+        value = _call(self._header("pop", key))
+        return default if value is None else value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+
+# Rendus adressés par contenu : l'aperçu PDF puis le téléchargement ne
+# rastérisent et ne construisent le rapport qu'une fois, même s'ils
+# tournent dans deux processus de tâche différents
+png_cache = RemoteCache("png")
+pdf_cache = RemoteCache("pdf")
+
+
+def _figure_dict(fig):
+    if isinstance(fig, go.Figure):
+        return fig.to_dict()
+    # Dictionnaire sans template : valeurs par défaut de go.Figure
+    if "template" not in fig.get("layout", {}):
+        return go.Figure(fig).to_dict()
+    return fig
+
+
+def _client_executor():
+    global _executor
+    with _start_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=RENDER_WORKERS, thread_name_prefix="render")
+        return _executor
+
+
+def submit_png(fig, width=None, height=None, scale=None):
+    """
+    Rendu PNG asynchrone d'une figure (go.Figure ou dict) : Future de bytes.
+    Le PNG est mis en cache par empreinte du JSON de la figure et des options.
+    """
+    fig = _figure_dict(fig)
+    key = content_hash([fig, width, height, scale])
+    header = {"op": "png", "key": key, "fig": fig, "width": width, "height": height, "scale": scale}
+    return _client_executor().submit(_call, header)
+
+
+def render_pngs(figs, progress=None, **options):
+    """
+    Rend un lot {clé: figure} en parallèle ; retourne {clé: bytes PNG}.
+    Les figures None sont ignorées. `progress(faits, total)` est appelé à
+    chaque figure terminée.
+    """
+    futures = {submit_png(fig, **options): key for key, fig in figs.items() if fig is not None}
+    pngs = {}
+    for future in as_completed(futures):
+        pngs[futures[future]] = future.result()
+        if progress is not None:
+            progress(len(pngs), len(futures))
+    return pngs
+
+
+# ============================================================
+# Processus de rendu (python -m components.renderer <pid du worker>)
+# ============================================================
+
+_scopes = queue.Queue()
+_stores = {}
+_stores_lock = threading.Lock()
+_clients = set()
+_closing = threading.Event()
+
+
+def _new_scope():
+    from kaleido.scopes.plotly import PlotlyScope
+
+    # plotly.js local et pas de MathJax (CDN) : aucun accès réseau au rendu
+    return PlotlyScope(
+        plotlyjs=PLOTLYJS if os.path.exists(PLOTLYJS) else None,
+        mathjax=False,
+    )
+
+
+def _boot_scope():
+    """Lance une instance et fait un premier rendu (démarrage de Chromium)."""
+    scope = None
+    try:
+        scope = _new_scope()
+        scope.transform(_BLANK, format="png", width=10, height=10)
+    except Exception:
+        # Démarrage à froid au premier vrai rendu
+        logger.exception("Démarrage d'une instance kaleido impossible")
+    _scopes.put(scope)
+
+
+def _store(name, ttl=RENDER_CACHE_TTL, maxbytes=RENDER_CACHE_MAX_BYTES):
+    with _stores_lock:
+        store = _stores.get(name)
+        if store is None:
+            store = _stores[name] = TTLCache(maxsize=None, ttl=ttl, maxbytes=maxbytes)
+        return store
+
+
+def _render(key, fig, width, height, scale):
+    png = _store("png").get(key)
+    if png is not None:
+        return png
+    scope = _scopes.get()
+    try:
+        if scope is None:
+            scope = _new_scope()
+        png = scope.transform(fig, format="png", width=width, height=height, scale=scale)
+    finally:
+        _scopes.put(scope)
+    _store("png").set(key, png)
+    return png
+
+
+def _handle(header, payload):
+    op = header.get("op")
+    if op == "png":
+        return _render(
+            str(header["key"]), header["fig"],
+            header.get("width"), header.get("height"), header.get("scale"),
+        )
+    name, key = str(header["cache"]), str(header["key"])
+    if op == "get":
+        return _store(name).get(key)
+    if op == "set":
+        _store(name, float(header["ttl"]), int(header["maxbytes"])).set(key, payload)
+        return None
+    if op == "pop":
+        return _store(name).pop(key)
+    raise ValueError(f"Requête de rendu inconnue : {op}")
+
+
+def _serve_connection(conn):
+    _clients.add(conn)
+    try:
+        _serve_requests(conn)
+    finally:
+        _clients.discard(conn)
+        conn.close()
+
+
+def _serve_requests(conn):
+    while True:
+        try:
+            header = json.loads(conn.recv_bytes(MAX_MESSAGE_BYTES))
+            if not isinstance(header, dict):
+                return
+            payload = conn.recv_bytes(MAX_MESSAGE_BYTES) if header.get("op") == "set" else None
+        except (EOFError, OSError, ValueError):
+            return
+        value = None
+        try:
+            value = _handle(header, payload)
+            reply = {"ok": True, "found": value is not None}
+        except Exception as exc:
+            logger.exception("Échec d'une requête de rendu")
+            reply = {"ok": False, "error": f"Rendu impossible : {exc}"}
+        try:
+            conn.send_bytes(json.dumps(reply).encode("utf-8"))
+            if value is not None:
+                conn.send_bytes(value)
+        except OSError:
+            return
+
+
+def _accept(listener):
+    while True:
+        try:
+            conn = listener.accept()
+        except Exception:
+            if _closing.is_set():
+                return
+            logger.exception("Connexion au processus de rendu refusée")
+            continue
+        threading.Thread(target=_serve_connection, args=(conn,), daemon=True).start()
+
+
+def _listen():
+    """Ouvre le socket ; None si un autre processus de rendu l'occupe déjà."""
+    try:
+        return Listener(RENDER_ADDRESS, authkey=_authkey())
+    except OSError as exc:
+        if exc.errno != errno.EADDRINUSE:
+            raise
+    if _probe() or sys.platform == "win32":
+        return None
+    # Socket laissé par un processus disparu (répertoire privé)
+    os.unlink(RENDER_ADDRESS)
+    return Listener(RENDER_ADDRESS, authkey=_authkey())
+
+
+def serve(owner):
+    """
+    Sert les rendus tant que le worker propriétaire est en vie, ou qu'un
+    autre processus (worker, tâche) y reste connecté.
+    """
+    listener = _listen()
+    if listener is None:
+        return
+
+    # plotly importe orjson à la première sérialisation : import fait ici,
+    # une fois, et non en concurrence dans les threads de démarrage
+    pio.to_json(_BLANK, validate=False)
+    for _ in range(RENDER_WORKERS):
+        threading.Thread(target=_boot_scope, daemon=True).start()
+    threading.Thread(target=_accept, args=(listener,), daemon=True).start()
+
+    try:
+        while psutil.pid_exists(owner) or _clients:
+            time.sleep(OWNER_POLL_INTERVAL)
+    finally:
+        _closing.set()
+        listener.close()
+        for _ in range(RENDER_WORKERS):
+            scope = _scopes.get()
+            if scope is not None:
+                scope._shutdown_kaleido()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    serve(int(sys.argv[1]))
@@ -1,18 +1,23 @@
 from components.export_pdf import generate_sus_pdf
 from components.charts import (
-    compute_sus_stats, create_gauge_native,
-    create_sus_class_histogram, empty_fig,
+    create_gauge_native,
+    CLASS_LABELS, create_sus_class_histogram, empty_fig,
     create_main_histogram, create_radar, create_category_combined
 )
 from components.ai_text import generate_ai_analysis
+from components.cache import get_dataset, store_dataset
+from components.jobs import heavy_job, job_options
+from components.pdf_api import publish_pdf
+from components.sus_data import (
+    SAMPLE_NAME, SAMPLE_PATH, load_sus_file, load_sus_files, append_sus_frame,
+    load_sample_dataset, read_upload
+)
+from components.sus_summary import CLASS_FILTER, filtered_view, get_summary
 from components.sus_layout import dashboard_layout, details_layout, ia_layout
-import tempfile
+from components.table_query import PAGE_SIZE, table_columns, table_page
 import dash
-import os
-from dash import Input, Output, State, dash_table, dcc, html
+from dash import Input, Output, State, ClientsideFunction, dash_table, html
 import dash_bootstrap_components as dbc
-import pandas as pd
-import numpy as np
 import io, base64
 
 
@@ -26,54 +31,23 @@ def register_callbacks(app):
     ...
 
 
-# ==============================================================  
-# 🔍 Détection colonnes SUS  
 # ==============================================================
 
-SUS_PATTERNS = [
-    ["Q1","Q2","Q3","Q4","Q5","Q6","Q7","Q8","Q9","Q10"],
-    ["SUS1","SUS2","SUS3","SUS4","SUS5","SUS6","SUS7","SUS8","SUS9","SUS10"],
-    ["Item1","Item2","Item3","Item4","Item5","Item6","Item7","Item8","Item9","Item10"],
-]
-
-def find_sus_columns(df: pd.DataFrame):
-    cols = list(df.columns)
-    for pattern in SUS_PATTERNS:
-        if all(c in cols for c in pattern):
-            return pattern
-    num_cols = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])]
-    return num_cols[:10] if len(num_cols) >= 10 else []
+def _preview_frame(df):
+    """Dataset sans colonnes _adj (le registre n'en contient plus par défaut :
+    on garde alors l'objet d'origine, dont l'empreinte est déjà connue)."""
+    cols = [c for c in df.columns if not c.endswith("_adj")]
+    return df if len(cols) == len(df.columns) else df[cols]
 
 
-# ==============================================================
-
-def compute_sus(df: pd.DataFrame, qcols: list[str]) -> pd.DataFrame:
-    df = df.copy()
-    for i, q in enumerate(qcols, start=1):
-        df[q] = pd.to_numeric(df[q], errors="coerce").clip(1, 5)
-        df[q + "_adj"] = (df[q] - 1) if i % 2 == 1 else (5 - df[q])
-    df["SUS_Score"] = df[[q + "_adj" for q in qcols]].sum(axis=1) * 2.5
-    return df
-
-
-# ==============================================================
+def _pdf_progress(set_progress):
+    """Rendu des graphiques sur 90 % de la barre, mise en page ensuite."""
+    def progress(done, total):
+        label = "Mise en page…" if done == total else f"Graphiques {done}/{total}"
+        set_progress((int(90 * done / total), label))
+    set_progress((0, "Graphiques…"))
+    return progress
 
-def parse_upload(contents, filename):
-    ctype, b64 = contents.split(',')
-    decoded = base64.b64decode(b64)
-
-    # Excel
-    if filename and filename.lower().endswith((".xlsx", ".xls")):
-        return pd.read_excel(io.BytesIO(decoded))
-
-    # CSV
-    try:
-        return pd.read_csv(io.BytesIO(decoded))
-    except:
-        return pd.read_csv(io.BytesIO(decoded), sep=';')
-
-
-# ==============================================================
 
 def register_callbacks(app):
 
@@ -86,36 +60,82 @@ def register_callbacks(app):
         Output('data-store', 'data'),
         Output("ai-analysis-visible-store", "data"),  # Ne pas modifier l'IA ici
         Input('upload-data', 'contents'),
+        Input('upload-result', 'data'),
         State('upload-data', 'filename'),
+        State('upload-append', 'value'),
+        State('data-store', 'data'),
         prevent_initial_call=True
     )
-    def load_file(contents, filename):
+    def load_file(contents, upload, filename, append, current):
+
+        # Fichier déjà importé via /api/upload/sus (assets/upload.js) ou exemple
+        if dash.ctx.triggered_id == "upload-result":
+            if not upload:
+                raise dash.exceptions.PreventUpdate
+            if upload.get("error"):
+                return f"❌ Erreur de lecture : {upload['error']}", None, "idle"
+            if upload.get("append"):
+                # Fichier brut reçu : fusion avec le dataset courant. Le handle
+                # (empreinte du contenu) peut être partagé par d'autres sessions :
+                # il n'est pas retiré, le TTL du registre l'expire
+                new_df = get_dataset(upload.get("handle"))
+                if new_df is None:
+                    return "❌ Erreur de lecture : fichier expiré", current, "idle"
+                info, handle = append_sus_frame(
+                    new_df, upload.get("filename"), current, scored=upload.get("scored", False)
+                )
+                return info, handle or current, "idle"
+            return upload.get("info"), upload.get("handle"), "idle"
 
         if contents is None:
             return "Aucun fichier importé.", None, "idle"  # Pas d'activation IA ici
 
-        try:
-            df = parse_upload(contents, filename or "fichier")
-            qcols = find_sus_columns(df)
-
-            if len(qcols) != 10:
-                return (
-                    "❌ Colonnes SUS non détectées (Q1..Q10 / SUS1..SUS10 / 10 numériques).",
-                    None,
-                    "idle"  # Pas d'activation IA ici
-                )
+        # multiple=True : listes (l'exemple, lui, arrive en valeur simple)
+        if isinstance(contents, str):
+            contents, filename = [contents], [filename]
+        filename = filename or [None] * len(contents)
 
-            df = compute_sus(df, qcols)
+        try:
+            payloads = [base64.b64decode(c.split(',')[1]) for c in contents]
+        except Exception as e:
+            return f"❌ Erreur de lecture : {e}", None, "idle"
 
-            info = (
-                f"✅ {filename} importé — {len(df)} réponses • "
-                f"Score moyen: {np.nanmean(df['SUS_Score']):.1f}"
+        # Le DataFrame reste côté serveur : le Store ne contient que le handle
+        append_to = current if append else None
+        if len(payloads) > 1:
+            info, handle = load_sus_files(
+                [(p, name or f"fichier {i + 1}") for i, (p, name) in enumerate(zip(payloads, filename))],
+                append_to=append_to,
             )
+        else:
+            info, handle = load_sus_file(
+                io.BytesIO(payloads[0]), filename[0] or "fichier", append_to=append_to
+            )
+        if append_to and handle is None:
+            handle = current        # échec de l'ajout : on garde le dataset chargé
+        return info, handle, "idle"  # Pas d'activation IA ici
 
-            return info, df.to_dict('records'), "idle"  # Pas d'activation IA ici
-
-        except Exception as e:
-            return f"❌ Erreur de lecture : {e}", None, "idle"
+    # Handle orphelin : le Store de session survit au redémarrage du worker
+    # ou à l'éviction du registre, pas le dataset. On vide le Store (onglets
+    # masqués) et on demande de réimporter, au lieu d'une page blanche.
+    @app.callback(
+        Output("file-info", "children", allow_duplicate=True),
+        Output("file-info", "style"),
+        Output("data-store", "data", allow_duplicate=True),
+        Input("data-store", "data"),
+        Input("sus-filter", "data"),
+        prevent_initial_call="initial_duplicate"
+    )
+    def check_dataset(data, filters):
+        if not data or get_dataset(data) is not None:
+            raise dash.exceptions.PreventUpdate
+        message = dbc.Alert(
+            "⚠️ Les données de cette session ne sont plus disponibles sur le "
+            "serveur : veuillez réimporter le fichier.",
+            color="warning",
+            className="mt-2 mb-0"
+        )
+        return message, {"display": "block"}, None
 
     #Declenchement de l'IA
 
@@ -124,18 +144,20 @@ def register_callbacks(app):
         Output("ai-analysis-visible-store", "data", allow_duplicate=True),  # Assurez-vous que l'analyse IA est stockée ici
         Input("btn-generate-ai", "n_clicks"),
         State('data-store', 'data'),
-        prevent_initial_call=True
+        prevent_initial_call=True,
+        **job_options("sus-ai-job", "btn-generate-ai")
     )
-    def generate_ai_analysis_callback(n_clicks, data):
+    @heavy_job
+    def generate_ai_analysis_callback(set_progress, n_clicks, data):
 
-        if not n_clicks or not data:
+        df = get_dataset(data)
+        if not n_clicks or df is None:
             raise dash.exceptions.PreventUpdate
 
-        df = pd.DataFrame(data)
-
+        set_progress((100, "Analyse IA en cours…"))
         try:
             # Construire le prompt pour l'IA
-            prompt = build_ai_prompt(df)
+            prompt = build_ai_prompt(df, get_summary(data, df))
 
             # Appeler la fonction qui génère l'analyse IA
             analysis = generate_ai_analysis(prompt)
@@ -158,17 +180,27 @@ def register_callbacks(app):
         Input('data-store', 'data')
     )
     def show_preview(data):
-        if not data:
+        df = get_dataset(data)
+        if df is None:
             return None
 
-        df = pd.DataFrame(data)
-        df = df[[c for c in df.columns if not c.endswith("_adj")]]
+        df = _preview_frame(df)
+
+        # Pagination / tri / filtre côté serveur : seule la page visible
+        # transite vers le navigateur (cf. update_preview_page)
+        records, page_count = table_page(df, 0, PAGE_SIZE)
 
         return dash_table.DataTable(
-            data=df.to_dict("records"),
-            columns=[{"name": i, "id": i} for i in df.columns],
-            filter_action="native",
-            sort_action="native",
+            id="sus-preview-table",
+            data=records,
+            columns=table_columns(df),
+            filter_action="custom",
+            sort_action="custom",
+            sort_mode="single",
+            page_action="custom",
+            page_current=0,
+            page_count=page_count,
+            filter_query="",
 
             style_table={"overflowY": "auto", "height": "75vh", "border": "none"},
             style_cell={"textAlign": "center", "fontSize": "13px", "padding": "6px", "border": "none"},
@@ -181,9 +213,27 @@ def register_callbacks(app):
             style_data_conditional=[
                 {"if": {"state": "active"}, "backgroundColor": "#f8f9fa", "border": "none"}
             ],
-            page_size=25
+            page_size=PAGE_SIZE
         )
 
+    @app.callback(
+        Output("sus-preview-table", "data"),
+        Output("sus-preview-table", "page_count"),
+        Output("sus-preview-table", "page_current"),
+        Input("sus-preview-table", "page_current"),
+        Input("sus-preview-table", "page_size"),
+        Input("sus-preview-table", "sort_by"),
+        Input("sus-preview-table", "filter_query"),
+        State("data-store", "data"),
+        prevent_initial_call=True
+    )
+    def update_preview_page(page_current, page_size, sort_by, filter_query, data):
+        df = get_dataset(data)
+        if df is None:
+            raise dash.exceptions.PreventUpdate
+
+        return table_page(_preview_frame(df), page_current, page_size, sort_by, filter_query)
+
 
 
     # ==========================================================
@@ -195,26 +245,35 @@ def register_callbacks(app):
         Output('kpi_count','children'),
         Output('kpi_mean','children'),
         Output('kpi_pct70','children'),
-        Input('data-store','data')
+        Input('data-store','data'),
+        Input('sus-filter','data')
     )
-    def update_graphs(data):
+    def update_graphs(data, filters):
 
-        if not data:
+        df = get_dataset(data)
+        if df is None:
             raise dash.exceptions.PreventUpdate
 
-        df = pd.DataFrame(data)
+        # --- Sous-population filtrée (dataset complet sans filtre) ---
+        view, agg = filtered_view(data, df, filters)
+        if not agg.count:
+            empty = {"gauge": empty_fig(), "hist": empty_fig(), "radar": empty_fig(), "class": empty_fig()}
+            return empty, "0", "–", "–"
 
-        # --- KPIs ---
-        n = len(df)
-        mean_sus = df["SUS_Score"].mean()
-        pct80 = float((df["SUS_Score"] >= 80).mean() * 100)
+        # --- KPIs (agrégats exacts, sans nouvelle passe sur les données) ---
+        n = agg.count
+        mean_sus = float(agg.mean)
+        pct80 = float(agg.pct_ge80)
 
         # --- Graphes ---
+        # L'histogramme par classe ignore son propre filtre : toutes les
+        # classes restent cliquables
+        class_view, class_agg = filtered_view(data, df, filters, exclude=CLASS_FILTER)
         figs = {
             "gauge": create_gauge_native(mean_sus),
-            "hist": create_main_histogram(df),
-            "radar": create_radar(df),
-            "class": create_sus_class_histogram(df),
+            "hist": create_main_histogram(view),
+            "radar": create_radar(view),
+            "class": create_sus_class_histogram(class_view, counts=class_agg.class_counts),
         }
 
         return (
@@ -226,6 +285,68 @@ def register_callbacks(app):
 
 
 
+    # ==========================================================
+    # 3️⃣ bis Filtres croisés (clic sur une classe ou une catégorie)
+    # ==========================================================
+
+    @app.callback(
+        Output("sus-filter", "data"),
+        Input("cat-graph-1", "clickData"),
+        Input("cat-graph-2", "clickData"),
+        Input("cat-graph-3", "clickData"),
+        Input("cat-graph-4", "clickData"),
+        Input("sus-class-hist", "clickData"),
+        Input("btn-clear-filter", "n_clicks"),
+        Input("data-store", "data"),
+        State("sus-filter", "data"),
+        prevent_initial_call=True
+    )
+    def update_filter(cat1, cat2, cat3, cat4, class_click, clear, data, current):
+        trigger = dash.ctx.triggered_id
+
+        # Nouveau dataset ou bouton « Retirer » : plus de filtre
+        if trigger in ("data-store", "btn-clear-filter"):
+            return {}
+
+        df = get_dataset(data)
+        click = dash.ctx.triggered[0]["value"]
+        if df is None or not click or not click.get("points"):
+            raise dash.exceptions.PreventUpdate
+        point = click["points"][0]
+
+        if trigger == "sus-class-hist":
+            # Une trace par classe, dans l'ordre des classes
+            key, value = CLASS_FILTER, point["curveNumber"]
+        else:
+            col = get_summary(data, df).category_slots[int(trigger[-1]) - 1]
+            if col is None:
+                raise dash.exceptions.PreventUpdate
+            key, value = str(col), str(point["x"])
+
+        filters = dict(current or {})
+        if filters.get(key) == value:
+            filters.pop(key)        # 2e clic sur la même barre : désélection
+        else:
+            filters[key] = value
+        return filters
+
+    @app.callback(
+        Output("sus-filter-label", "children"),
+        Output("sus-filter-bar", "style"),
+        Input("sus-filter", "data")
+    )
+    def show_filter(filters):
+        if not filters:
+            return "", {"display": "none"}
+
+        parts = [
+            f"Classe = {CLASS_LABELS[int(v)].replace('<br>', ' ')}" if k == CLASS_FILTER else f"{k} = {v}"
+            for k, v in filters.items()
+        ]
+        return "🔎 Filtre : " + " • ".join(parts), {"display": "block"}
+
+
+
     # ==========================================================
     # 4️⃣ Catégories
     # ==========================================================
@@ -239,49 +360,25 @@ def register_callbacks(app):
         Input("data-store", "data")
     )
     def update_categories(data):
-        if not data:
-            return empty_fig(), empty_fig(), empty_fig(), empty_fig(), {"display": "none"}
-
-        df = pd.DataFrame(data)
-        cols = list(df.columns)
-
-        # 1) Trouver Q10
-        try:
-            q10_index = cols.index("Q10")
-        except ValueError:
+        df = get_dataset(data)
+        if df is None:
             return empty_fig(), empty_fig(), empty_fig(), empty_fig(), {"display": "none"}
 
-        # 2) Prendre EXACTEMENT les 4 colonnes après Q10
-        raw_cat_cols = cols[q10_index + 1 : q10_index + 5]
-
-        # 3) Exclure les colonnes _adj
-        cat_cols = [c for c in raw_cat_cols if not c.endswith("_adj")]
+        summary = get_summary(data, df)
 
         figs = []
         visible_any = False
 
-        # 4) Pour chaque position parmi les 4 colonnes immédiatement après Q10 :
-        for i, col in enumerate(raw_cat_cols):
-
-            # si c'est une colonne _adj → vide
-            if col.endswith("_adj"):
-                figs.append(empty_fig())
-                continue
-
-            # si colonne vide ou non existante
-            if col not in df or df[col].dropna().empty:
+        # Colonnes suivant la dernière question (None : position vide)
+        for i, col in enumerate(summary.category_slots):
+            if col is None:
                 figs.append(empty_fig())
                 continue
 
-            # sinon c'est une vraie catégorie
             visible_any = True
-            figs.append(create_category_combined(df, col, i))
-
-        # 5) Compléter si moins de 4
-        while len(figs) < 4:
-            figs.append(empty_fig())
+            figs.append(create_category_combined(df, col, i, summary.categories[col]))
 
-        # 6) Montrer/masquer la section
+        # Montrer/masquer la section
         section_style = {"display": "block"} if visible_any else {"display": "none"}
 
         return figs[0], figs[1], figs[2], figs[3], section_style
@@ -294,44 +391,36 @@ def register_callbacks(app):
     # 5️⃣ Analyse IA
     # ==========================================================
     
-    def build_ai_prompt(df):
+    def build_ai_prompt(df, summary):
 
         # Scores et classes
         scores = df["SUS_Score"].tolist()
-        classes = df["SUS_Class"].value_counts().to_dict() if "SUS_Class" in df else {}
+        classes = summary.classes
 
-        # Statistiques globales avancées
+        # Statistiques globales (résumé partagé avec KPIs et tableau)
         stats = {
-            "Moyenne": round(df["SUS_Score"].mean(), 2),
-            "Médiane": round(df["SUS_Score"].median(), 2),
-            "Ecart-type": round(df["SUS_Score"].std(), 2),
-            "Q1": round(df["SUS_Score"].quantile(0.25), 2),
-            "Q3": round(df["SUS_Score"].quantile(0.75), 2),
-            "IQR": round(df["SUS_Score"].quantile(0.75) - df["SUS_Score"].quantile(0.25), 2),
-            "Min": df["SUS_Score"].min(),
-            "Max": df["SUS_Score"].max(),
-            "Taille": len(df),
-            "% ≥ 80": round((df["SUS_Score"] >= 80).mean() * 100, 1),
-            "% < 50": round((df["SUS_Score"] < 50).mean() * 100, 1)
+            "Moyenne": round(summary.mean, 2),
+            "Médiane": round(summary.median, 2),
+            "Ecart-type": round(summary.std, 2),
+            "Q1": round(summary.q1, 2),
+            "Q3": round(summary.q3, 2),
+            "IQR": round(summary.q3 - summary.q1, 2),
+            "Min": summary.min,
+            "Max": summary.max,
+            "Taille": summary.count,
+            "% ≥ 80": round(summary.pct_ge80, 1),
+            "% < 50": round(summary.pct_lt50, 1)
         }
 
-        # Colonnes SUS (Q1..Q10)
-        qcols = [c for c in df.columns if c.startswith("Q") and not c.endswith("_adj")]
-        per_question_mean = df[qcols].mean().round(2).to_dict()
-        per_question_std = df[qcols].std().round(2).to_dict()
+        # Questions SUS
+        per_question_mean = {q: round(float(v), 2) for q, v in summary.item_means.items()}
+        per_question_std = {q: round(float(v), 2) for q, v in summary.item_stds.items()}
 
         weakest_q = min(per_question_mean, key=per_question_mean.get)
         strongest_q = max(per_question_mean, key=per_question_mean.get)
 
-        # Catégories (âge, pays…)
-        categories = {}
-        extra_cols = df.columns[11:15]
-
-        if len(extra_cols) > 0:
-            for col in extra_cols:
-                categories[col] = df.groupby(col)["SUS_Score"].mean().round(2).to_dict()
-        else:
-            categories = {}
+        # Catégories (mêmes groupes que les graphes)
+        categories = summary.category_means()
 
         weakest_cat = {}
         strongest_cat = {}
@@ -429,18 +518,20 @@ def register_callbacks(app):
         Output("ai-analysis", "data", allow_duplicate=True),
         Input("ai-analysis-visible-store", "data"),
         State("data-store", "data"),
-        prevent_initial_call=True
+        prevent_initial_call=True,
+        **job_options("sus-ai-job", "btn-generate-ai")
     )
-    def run_ai_when_ready(flag, data):
+    @heavy_job
+    def run_ai_when_ready(set_progress, flag, data):
 
         # Si aucun fichier ou pas de demande IA → ne rien faire
-        if flag != "run" or not data:
+        df = get_dataset(data)
+        if flag != "run" or df is None:
             raise dash.exceptions.PreventUpdate
 
-        df = pd.DataFrame(data)
-
+        set_progress((100, "Analyse IA en cours…"))
         try:
-            prompt = build_ai_prompt(df)
+            prompt = build_ai_prompt(df, get_summary(data, df))
             analysis = generate_ai_analysis(prompt)
             return analysis, "done", analysis
             
@@ -461,15 +552,18 @@ def register_callbacks(app):
 
     @app.callback(
         Output("sus-stats-table", "data"),
-        Input("data-store", "data")
+        Input("data-store", "data"),
+        Input("sus-filter", "data")
     )
-    def update_sus_stats(data):
-        if not data:
+    def update_sus_stats(data, filters):
+        df = get_dataset(data)
+        if df is None:
             return []
 
-        df = pd.DataFrame(data)
-        stats_df = compute_sus_stats(df)
-        return stats_df.to_dict("records")
+        if not filters:
+            return get_summary(data, df).stats_table.to_dict("records")
+        _, agg = filtered_view(data, df, filters)
+        return agg.stats_table().to_dict("records")
 
 
 
@@ -479,55 +573,46 @@ def register_callbacks(app):
 
     @app.callback(
         Output("export-status", "children"),
-        Output("download-pdf", "data"),
+        Output("download-pdf-url", "data"),
         Input("btn-export", "n_clicks"),
         State("data-store", "data"),
         State("fig-store", "data"),
         State("sus-stats-table", "data"),
         State("ai-analysis-visible-store", "data"),
+        State("sus-filter", "data"),
 
-        prevent_initial_call=True
+        prevent_initial_call=True,
+        **job_options("sus-pdf-job", "btn-export")
     )
+    @heavy_job
     def export_pdf(
-        n_clicks, data, figs, stats_table, ai_text
+        set_progress, n_clicks, data, figs, stats_table, ai_text, filters
     ):
-        if not data:
+        df = get_dataset(data)
+        if df is None:
             return "❌ Aucune donnée à exporter", dash.no_update
-
-        df = pd.DataFrame(data)
-
-        output_path = os.path.join(tempfile.gettempdir(), "rapport_SUS.pdf")
+        summary = get_summary(data, df)
+        # Rapport de la sous-population affichée (mêmes figures / stats)
+        df, _ = filtered_view(data, df, filters)
 
         safe_ai = ai_text if isinstance(ai_text, str) else ""
 
-        generate_sus_pdf(df, figs, output_path, safe_ai, stats_table)
-
-        with open(output_path, "rb") as f:
-            pdf_bytes = f.read()
-
-        return "✅ PDF généré avec succès", dcc.send_bytes(
-            lambda buffer: buffer.write(pdf_bytes),
-            "Rapport_SUS.pdf"
+        # PDF construit en mémoire : propre à cette requête
+        pdf_bytes = generate_sus_pdf(
+            df, figs, safe_ai, stats_table,
+            progress=_pdf_progress(set_progress), summary=summary,
         )
 
-    def generate_sus_pdf_bytes(df, figs, stats_table, ai_text):
-        """
-        Génére un PDF en mémoire et retourne les bytes.
-        """
-        # Fichier temporaire
-        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
-            path = tmp.name
-
-        # Génération via ton script existant
-        generate_sus_pdf(df, figs, path, ai_text, stats_table)
-
-        # Lecture en bytes
-        with open(path, "rb") as f:
-            data = f.read()
-
-        os.remove(path)
-        return data
+        # URL /api/pdf seulement : les octets ne passent pas par le cache des
+        # tâches, le navigateur télécharge le fichier (assets/clientside.js)
+        return "✅ PDF généré avec succès", publish_pdf(pdf_bytes, "Rapport_SUS.pdf")
 
+    app.clientside_callback(
+        ClientsideFunction(namespace="ux", function_name="download_pdf"),
+        Output("download-pdf-url", "clear_data"),
+        Input("download-pdf-url", "data"),
+        prevent_initial_call=True,
+    )
 
     # ==========================================================
     #  PDF — Génération + Preview + Télécharger
@@ -540,22 +625,29 @@ def register_callbacks(app):
         State("fig-store", "data"),
         State("sus-stats-table", "data"),
         State("ai-analysis-visible-store", "data"),
-        prevent_initial_call=True
+        State("sus-filter", "data"),
+        prevent_initial_call=True,
+        **job_options("sus-pdf-job", "btn-generate-pdf")
     )
-    def generate_pdf_preview(n_clicks, data, figs, stats_table, ai_text):
+    @heavy_job
+    def generate_pdf_preview(set_progress, n_clicks, data, figs, stats_table, ai_text, filters):
 
-        if not data:
+        df = get_dataset(data)
+        if df is None:
             return "Aucune donnée à exporter.", ""
-
-        df = pd.DataFrame(data)
+        summary = get_summary(data, df)
+        df, _ = filtered_view(data, df, filters)
 
         # 1) Génération PDF en mémoire
-        pdf_bytes = generate_sus_pdf_bytes(df, figs, stats_table, ai_text)
-        b64 = base64.b64encode(pdf_bytes).decode("utf-8")
+        pdf_bytes = generate_sus_pdf(
+            df, figs, ai_text, stats_table,
+            progress=_pdf_progress(set_progress), summary=summary,
+        )
+        url = publish_pdf(pdf_bytes, "Rapport_SUS.pdf")
 
-        # 2) Preview dans un Iframe
+        # 2) Preview dans un Iframe (PDF servi par /api/pdf, pas de base64)
         iframe = html.Iframe(
-            src=f"data:application/pdf;base64,{b64}",
+            src=url,
             style={
                 "width": "100%",
                 "height": "100%",
@@ -566,7 +658,7 @@ def register_callbacks(app):
         # 3) Bouton Télécharger
         download_button = html.A(
             dbc.Button("Télécharger le PDF", color="success"),
-            href=f"data:application/pdf;base64,{b64}",
+            href=f"{url}?download=1",
             download="Rapport_SUS.pdf",
             target="_blank"
         )
@@ -577,24 +669,23 @@ def register_callbacks(app):
     # ==========================================================
     # 8️⃣ Onglets
     # ==========================================================
-    @app.callback(
+    # Clientside (assets/clientside.js) : un clic d'onglet ne renvoie plus
+    # rien au serveur ; seul l'indicateur « dataset chargé » est suivi
+    app.clientside_callback(
+        ClientsideFunction(namespace="ux", function_name="sus_loaded"),
+        Output("data-loaded", "data"),
+        Input("data-store", "data")
+    )
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="ux", function_name="show_tabs"),
         Output("tab-dashboard", "style"),
         Output("tab-details", "style"),
         Output("tab-ia", "style"),
         Output("tab-pdf", "style"),
         Input("sus-tabs", "active_tab"),
-        Input("data-store", "data")
+        Input("data-loaded", "data")
     )
-    def show_tabs(active, data):
-
-        is_loaded = data is not None and len(data) > 0
-
-        return (
-            {"display": "block"} if active == "tab-dashboard" and is_loaded else {"display": "none"},
-            {"display": "block"} if active == "tab-details" else {"display": "none"},
-            {"display": "block"} if active == "tab-ia" else {"display": "none"},
-            {"display": "block"} if active == "tab-pdf" else {"display": "none"},
-        )
 
 
 
@@ -640,15 +731,14 @@ def register_callbacks(app):
     # ==========================================================
     # MODAL — Aide Template
     # ==========================================================
-    @app.callback(
+    app.clientside_callback(
+        ClientsideFunction(namespace="ux", function_name="toggle"),
         Output("modal-help-template", "is_open"),
         Input("btn-help-template", "n_clicks"),
         Input("close-help-template", "n_clicks"),
         State("modal-help-template", "is_open"),
         prevent_initial_call=True
     )
-    def toggle_modal(btn_open, btn_close, is_open):
-        return not is_open
 
 
 
@@ -690,30 +780,24 @@ def register_callbacks(app):
     # ==========================================================
 
     @app.callback(
-        Output("upload-data", "contents"),
-        Output("upload-data", "filename"),
+        Output("upload-result", "data"),
         Input("btn-load-sample", "n_clicks"),
+        State("upload-append", "value"),
         prevent_initial_call=True
     )
-    def load_sample(n):
+    def load_sample(n, append):
         if not n:
             raise dash.exceptions.PreventUpdate
 
-        # --- Chemin absolu vers assets ---
-        assets_dir = os.path.join(os.path.dirname(__file__), "..", "assets")
-        sample_path = os.path.abspath(os.path.join(assets_dir, "sample.xlsx"))
-
-        # --- Lecture et conversion EXACTE format d’upload ---
-        with open(sample_path, "rb") as f:
-            b64 = base64.b64encode(f.read()).decode()
-
-        contents = (
-            "data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,"
-            + b64
-        )
+        # --- Même chemin qu'un fichier envoyé via /api/upload/sus ---
+        if append:
+            with open(SAMPLE_PATH, "rb") as f:
+                raw = read_upload(f, SAMPLE_NAME)
+            return {"handle": store_dataset(raw), "filename": SAMPLE_NAME, "append": True}
 
-        # --- Retourne EXACTEMENT ce que dcc.Upload renvoie ---
-        return contents, "sample.xlsx"
+        # Exemple déjà scoré au démarrage : aucun octet ne transite
+        info, handle = load_sample_dataset()
+        return {"handle": handle, "filename": SAMPLE_NAME, "info": info}
 
 
 
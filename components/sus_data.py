@@ -0,0 +1,725 @@
+import io
+import multiprocessing
+import os
+import threading
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from components.cache import (
+    TTLCache, DATASET_TTL, DATASET_MAX_ENTRIES, get_dataset, store_dataset,
+    upload_digest,
+)
+from components.ingest import read_csv, read_excel
+from utils.sus_scoring import sus_adjusted, sus_scores
+
+
+# ==============================================================
+# 🔍 Détection colonnes SUS
+# ==============================================================
+
+SUS_PATTERNS = [
+    ["Q1","Q2","Q3","Q4","Q5","Q6","Q7","Q8","Q9","Q10"],
+    ["SUS1","SUS2","SUS3","SUS4","SUS5","SUS6","SUS7","SUS8","SUS9","SUS10"],
+    ["Item1","Item2","Item3","Item4","Item5","Item6","Item7","Item8","Item9","Item10"],
+]
+
+# Colonnes de catégories lues après la dernière question
+N_CATEGORY_COLUMNS = 4
+
+# Colonne ajoutée à l'import par lots : nom du fichier d'origine
+SOURCE_COLUMN = "Fichier_source"
+
+
+def is_derived_column(col) -> bool:
+    """Colonne ajoutée par l'application (score, _adj, fichier source)."""
+    return col in ("SUS_Score", SOURCE_COLUMN) or str(col).endswith("_adj")
+
+MSG_NO_SUS_COLUMNS = "❌ Colonnes SUS non détectées (Q1..Q10 / SUS1..SUS10 / 10 numériques)."
+
+
+class SUSColumnsError(ValueError):
+    def __init__(self, message=MSG_NO_SUS_COLUMNS):
+        # Argument explicite : l'exception doit traverser le pool de processus
+        super().__init__(message)
+
+
+def find_sus_columns(df: pd.DataFrame):
+    cols = list(df.columns)
+    for pattern in SUS_PATTERNS:
+        if all(c in cols for c in pattern):
+            return pattern
+    num_cols = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c])]
+    return num_cols[:10] if len(num_cols) >= 10 else []
+
+
+# ==============================================================
+# 🧮 Scoring
+# ==============================================================
+
+def compute_sus(df: pd.DataFrame, qcols: list[str], keep_adj: bool = False) -> pd.DataFrame:
+    """
+    Ajoute SUS_Score (noyau vectorisé utils.sus_scoring). Les réponses sont
+    converties en numérique et bornées à [1, 5] ; les colonnes `_adj` ne sont
+    ajoutées que si keep_adj=True.
+    """
+    # Copie superficielle : seules les colonnes réassignées sont nouvelles
+    df = df.copy(deep=False)
+    for q in qcols:
+        df[q] = pd.to_numeric(df[q], errors="coerce").clip(1, 5)
+
+    items = df[qcols].to_numpy(dtype=np.float64, na_value=np.nan)
+    if keep_adj:
+        adj = sus_adjusted(items)
+        for j, q in enumerate(qcols):
+            df[q + "_adj"] = adj[:, j]
+    df["SUS_Score"] = sus_scores(items)
+    return df
+
+
+# ==============================================================
+# 🗜️ Types compacts pour les datasets gardés en mémoire
+# ==============================================================
+
+# Au-delà de cette part de valeurs distinctes, une colonne texte reste object
+CATEGORY_MAX_RATIO = 0.5
+
+
+def _compact_likert(col):
+    values = col.to_numpy(dtype=float, na_value=np.nan)
+    known = values[~np.isnan(values)]
+    if not np.array_equal(known, np.round(known)):
+        return col      # réponses décimales : valeurs saisies gardées telles quelles
+    # Réponses entières 1..5 : int8, ou Int8 (nullable) s'il manque des réponses
+    return col.astype("Int8" if len(known) < len(values) else np.int8)
+
+
+def compact_sus_frame(df: pd.DataFrame, qcols) -> pd.DataFrame:
+    """
+    Réduit l'empreinte mémoire d'un dataset scoré : questions en int8/Int8,
+    scores en float32 (multiples de 2,5 : exacts), entiers réduits, colonnes
+    texte peu variées en category. Les décimaux saisis restent en float64
+    (5.4 doit rester 5.4 pour l'aperçu, les filtres et les catégories).
+    """
+    df = df.copy(deep=False)
+    for col in df.columns:
+        s = df[col]
+        if col in qcols:
+            df[col] = _compact_likert(s)
+        elif col == "SUS_Score" or str(col).endswith("_adj"):
+            df[col] = s.astype(np.float32)
+        elif pd.api.types.is_bool_dtype(s) or isinstance(s.dtype, pd.CategoricalDtype):
+            continue
+        elif pd.api.types.is_integer_dtype(s):
+            df[col] = pd.to_numeric(s, downcast="integer")
+        elif pd.api.types.is_float_dtype(s):
+            continue
+        elif s.nunique() <= len(s) * CATEGORY_MAX_RATIO:
+            df[col] = s.astype("category")
+    return df
+
+
+def dataset_memory(df: pd.DataFrame) -> str:
+    """Empreinte mémoire lisible (Ko / Mo) d'un DataFrame."""
+    size = df.memory_usage(deep=True).sum()
+    if size < 1024 * 1024:
+        return f"{size / 1024:.0f} Ko"
+    return f"{size / (1024 * 1024):.1f} Mo"
+
+
+# Bornes des classes (mêmes que create_sus_class_histogram, intervalles [a, b[)
+SUS_CLASS_BINS = [0, 25, 51, 68, 80, 84, 100]
+
+
+class SUSAggregates:
+    """Agrégats SUS cumulables bloc par bloc (exacts, mémoire constante)."""
+
+    def __init__(self, qcols):
+        self.qcols = list(qcols)
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0                   # somme des carrés des écarts (Welford/Chan)
+        self.min = np.inf
+        self.max = -np.inf
+        self.n_ge80 = 0
+        self.item_sums = np.zeros(len(self.qcols))
+        self.item_counts = np.zeros(len(self.qcols), dtype=np.int64)
+        self.class_counts = np.zeros(len(SUS_CLASS_BINS) - 1, dtype=np.int64)
+        # Effectif par valeur de score (multiples de 2,5 pour des réponses
+        # entières) : médiane et quartiles exacts sans garder les scores
+        self.score_counts = {}
+
+    @classmethod
+    def from_frame(cls, df, qcols):
+        agg = cls(qcols)
+        agg.update(df)
+        return agg
+
+    def update(self, df):
+        """Ajoute un bloc déjà scoré (colonnes qcols + SUS_Score)."""
+        scores = df["SUS_Score"].to_numpy(dtype=float)
+        scores = scores[~np.isnan(scores)]
+        items = df[self.qcols].to_numpy(dtype=float, na_value=np.nan)
+
+        block = SUSAggregates(self.qcols)
+        valid = ~np.isnan(items)
+        block.item_sums = np.where(valid, items, 0.0).sum(axis=0)
+        block.item_counts = valid.sum(axis=0)
+
+        if len(scores):
+            block.count = len(scores)
+            block.mean = scores.mean()
+            block.m2 = ((scores - block.mean) ** 2).sum()
+            block.min = scores.min()
+            block.max = scores.max()
+            block.n_ge80 = int((scores >= 80).sum())
+
+            idx = np.searchsorted(SUS_CLASS_BINS, scores, side="right") - 1
+            idx = idx[(idx >= 0) & (idx < len(block.class_counts))]
+            block.class_counts = np.bincount(idx, minlength=len(block.class_counts))
+
+            values, counts = np.unique(scores, return_counts=True)
+            block.score_counts = dict(zip(values.tolist(), counts.tolist()))
+
+        self.merge(block)
+
+    def merge(self, other):
+        """Cumule les agrégats d'un autre bloc (mêmes questions, par position)."""
+        self.item_sums += other.item_sums
+        self.item_counts += other.item_counts
+
+        n_b = other.count
+        if n_b == 0:
+            return
+
+        # Fusion des moments (Chan et al.) : exacte quel que soit le découpage
+        n = self.count + n_b
+        delta = other.mean - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += other.m2 + delta ** 2 * self.count * n_b / n
+        self.count = n
+
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.n_ge80 += other.n_ge80
+        self.class_counts += other.class_counts
+
+        for v, c in other.score_counts.items():
+            self.score_counts[v] = self.score_counts.get(v, 0) + c
+
+    def copy(self):
+        agg = SUSAggregates(self.qcols)
+        agg.__dict__.update({k: (v.copy() if hasattr(v, "copy") else v)
+                             for k, v in self.__dict__.items()})
+        return agg
+
+    def quantile(self, q):
+        """Quantile (interpolation linéaire, comme pandas) depuis les effectifs."""
+        if not self.count:
+            return np.nan
+        values = np.array(sorted(self.score_counts))
+        cum = np.cumsum([self.score_counts[v] for v in values])
+        h = (self.count - 1) * q
+        lo = int(np.floor(h))
+        x_lo = values[np.searchsorted(cum, lo, side="right")]
+        x_hi = values[np.searchsorted(cum, min(lo + 1, self.count - 1), side="right")]
+        return float(x_lo + (h - lo) * (x_hi - x_lo))
+
+    def pct(self, predicate):
+        """% des scores vérifiant predicate(valeur)."""
+        if not self.count:
+            return 0.0
+        n = sum(c for v, c in self.score_counts.items() if predicate(v))
+        return n / self.count * 100
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else np.nan
+
+    @property
+    def std(self):
+        return float(np.sqrt(self.variance))
+
+    @property
+    def item_means(self):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return dict(zip(self.qcols, self.item_sums / self.item_counts))
+
+    @property
+    def pct_ge80(self):
+        return self.n_ge80 / self.count * 100 if self.count else 0.0
+
+    def stats_table(self):
+        """Même tableau que charts.compute_sus_stats, depuis les agrégats."""
+        if not self.count:
+            return pd.DataFrame(columns=["Indicateur", "Valeur"])
+
+        Q1 = self.quantile(0.25)
+        Q3 = self.quantile(0.75)
+
+        stats = {
+            # Indicateurs centraux
+            "Score SUS moyen": round(self.mean, 2),
+            "Taille de l’échantillon": self.count,
+            "Médiane": round(self.quantile(0.5), 1),
+
+            # Étendue
+            "Score minimum": round(self.min, 1),
+            "Score maximum": round(self.max, 1),
+            "Amplitude (max - min)": round(self.max - self.min, 1),
+
+            # Dispersion
+            "Écart-type": round(self.std, 2),
+            "Coefficient de variation (%)": round((self.std / self.mean) * 100, 1),
+            "1er quartile (Q1)": round(Q1, 1),
+            "3e quartile (Q3)": round(Q3, 1),
+            "IQR (Q3 - Q1)": round(Q3 - Q1, 1),
+
+            # Indicateurs opérationnels
+            "% des scores ≥ 68": round(self.pct(lambda v: v >= 68), 1),
+            "% des scores ≤ 51": round(self.pct(lambda v: v <= 51), 1),
+        }
+
+        return pd.DataFrame(stats.items(), columns=["Indicateur", "Valeur"])
+
+
+_aggregates = TTLCache(maxsize=DATASET_MAX_ENTRIES, ttl=DATASET_TTL)
+
+
+def get_aggregates(handle, df):
+    """Agrégats du dataset ; recalculés depuis le DataFrame s'ils ont expiré."""
+    agg = _aggregates.get(handle)
+    if agg is None:
+        qcols = find_sus_columns(df)
+        agg = SUSAggregates.from_frame(df, qcols)
+        _aggregates.set(handle, agg)
+    return agg
+
+
+# ==============================================================
+# 📥 Lecture des fichiers
+# ==============================================================
+
+# Au-delà de cette taille, un CSV est lu et scoré par blocs
+CSV_STREAM_THRESHOLD = 20 * 1024 * 1024
+CSV_CHUNK_ROWS = 50_000
+
+
+def sus_excel_columns(header):
+    """
+    Colonnes Excel utiles : tout jusqu'à la dernière question + les 4
+    catégories qui suivent. Les colonnes au-delà (verbatims…) sont ignorées.
+    Sans en-têtes SUS reconnus, tout est chargé (détection numérique).
+    """
+    for pattern in SUS_PATTERNS:
+        if all(c in header for c in pattern):
+            last = max(header.index(c) for c in pattern)
+            return range(last + 1 + N_CATEGORY_COLUMNS)
+    return None
+
+
+def read_upload(fileobj, filename):
+    """Lit un fichier (objet binaire seekable) en DataFrame."""
+
+    # Excel
+    if filename and filename.lower().endswith(".xlsx"):
+        return read_excel(fileobj, select=sus_excel_columns)
+    if filename and filename.lower().endswith(".xls"):
+        return pd.read_excel(fileobj)
+
+    # CSV — séparateur / encodage / décimale détectés, une seule lecture
+    return read_csv(fileobj)
+
+
+def _file_size(fileobj):
+    pos = fileobj.tell()
+    fileobj.seek(0, io.SEEK_END)
+    size = fileobj.tell()
+    fileobj.seek(pos)
+    return size
+
+
+def stream_sus_csv(fileobj):
+    """
+    Lit un CSV par blocs : chaque bloc est scoré et les agrégats sont
+    cumulés au fil de l'eau.
+    Retourne (df, aggregates).
+    """
+    agg = None
+    parts = []          # blocs compactés : le dataset complet reste en mémoire (aperçu, graphes)
+    for chunk in read_csv(fileobj, chunksize=CSV_CHUNK_ROWS):
+        if agg is None:
+            qcols = find_sus_columns(chunk)
+            if len(qcols) != 10:
+                raise SUSColumnsError()
+            agg = SUSAggregates(qcols)
+        scored = compute_sus(chunk, qcols)
+        agg.update(scored)
+        parts.append(compact_sus_frame(scored, qcols))
+
+    if agg is None:
+        raise SUSColumnsError()
+    return concat_compact(parts), agg
+
+
+def concat_compact(parts):
+    """
+    Concatène des blocs déjà compactés sans les re-compacter. Les colonnes
+    category reçoivent l'union des catégories de tous les blocs (sinon
+    pandas repasse en object) ; les blocs sont modifiés en place.
+    """
+    for col in parts[0].columns:
+        if not any(isinstance(p[col].dtype, pd.CategoricalDtype) for p in parts):
+            continue
+        try:
+            dtype = pd.CategoricalDtype(
+                union_categoricals([p[col].astype("category") for p in parts]).categories
+            )
+        except TypeError:
+            dtype = object      # catégories de types différents d'un bloc à l'autre
+        for p in parts:
+            p[col] = p[col].astype(dtype)
+    return pd.concat(parts, ignore_index=True)
+
+
+def ingest_sus(fileobj, filename):
+    """Lit et score un fichier SUS. Retourne (df, aggregates)."""
+    is_csv = not (filename and filename.lower().endswith((".xlsx", ".xls")))
+    if is_csv and _file_size(fileobj) > CSV_STREAM_THRESHOLD:
+        return stream_sus_csv(fileobj)
+
+    df = read_upload(fileobj, filename)
+    qcols = find_sus_columns(df)
+    if len(qcols) != 10:
+        raise SUSColumnsError()
+    df = compute_sus(df, qcols)
+    agg = SUSAggregates.from_frame(df, qcols)
+    return compact_sus_frame(df, qcols), agg
+
+
+# ==============================================================
+# 📚 Import par lots : plusieurs fichiers scorés en parallèle
+# ==============================================================
+
+# Processus par worker web, au plus : réglable, borné par le nombre de CPU
+BATCH_MAX_WORKERS = max(
+    min(int(os.environ.get("BATCH_MAX_WORKERS", "4")), os.cpu_count() or 1), 1
+)
+# Pool arrêté après ce délai sans lot (secondes)
+BATCH_POOL_IDLE = float(os.environ.get("BATCH_POOL_IDLE", "60"))
+
+_pool = None
+_pool_size = 0
+_pool_users = 0
+_idle_timer = None
+_pool_lock = threading.Lock()
+
+
+@contextmanager
+def _batch_pool(n_files):
+    """
+    Pool de processus partagé entre les lots en cours, dimensionné au lot
+    (au plus BATCH_MAX_WORKERS) et arrêté après BATCH_POOL_IDLE s d'inactivité.
+    """
+    global _pool, _pool_size, _pool_users, _idle_timer
+    size = min(n_files, BATCH_MAX_WORKERS)
+    with _pool_lock:
+        if _idle_timer is not None:
+            _idle_timer.cancel()
+            _idle_timer = None
+        # Lot plus grand que le pool inutilisé : on le redimensionne
+        if _pool is not None and _pool_users == 0 and _pool_size < size:
+            _pool.shutdown(wait=False)
+            _pool = None
+        if _pool is None:
+            # spawn : pas de fork d'un serveur multi-threadé (verrous hérités)
+            _pool = ProcessPoolExecutor(
+                max_workers=size,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _pool_size = size
+        _pool_users += 1
+        pool = _pool
+    try:
+        yield pool
+    finally:
+        with _pool_lock:
+            _pool_users -= 1
+            if _pool_users == 0 and _pool is not None:
+                _idle_timer = threading.Timer(BATCH_POOL_IDLE, _stop_idle_pool)
+                _idle_timer.daemon = True
+                _idle_timer.start()
+
+
+def _stop_idle_pool():
+    """Aucun lot depuis BATCH_POOL_IDLE s : processus du pool libérés."""
+    global _pool, _idle_timer
+    with _pool_lock:
+        _idle_timer = None
+        if _pool is not None and _pool_users == 0:
+            _pool.shutdown(wait=False)
+            _pool = None
+
+
+def _reset_pool():
+    """Pool cassé (processus tué) : il sera recréé au prochain lot."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _ingest_bytes(payload, filename):
+    """Tâche exécutée dans un processus du pool."""
+    return ingest_sus(io.BytesIO(payload), filename)
+
+
+def ingest_sus_batch(files):
+    """
+    Lit et score plusieurs fichiers (liste de (contenu binaire, nom)).
+    Chaque fichier est traité dans un processus du pool, puis les résultats
+    sont concaténés avec une colonne SOURCE_COLUMN.
+    Retourne (df, aggregates, erreurs {nom: message}).
+    """
+    with _batch_pool(len(files)) if len(files) > 1 else nullcontext() as pool:
+        futures = [(name, pool.submit(_ingest_bytes, payload, name) if pool else None)
+                   for payload, name in files]
+
+        parts, agg, errors = [], None, {}
+        for (name, future), (payload, _) in zip(futures, files):
+            try:
+                df, file_agg = future.result() if future else _ingest_bytes(payload, name)
+            except BrokenProcessPool:
+                _reset_pool()
+                raise
+            except SUSColumnsError as e:
+                errors[name] = str(e)
+                continue
+            except Exception as e:
+                errors[name] = f"❌ Erreur de lecture : {e}"
+                continue
+
+            if agg is None:
+                agg = SUSAggregates(file_agg.qcols)
+            elif file_agg.qcols != agg.qcols:
+                # Q1..Q10 / SUS1..SUS10… : alignement par position
+                df = df.rename(columns=dict(zip(file_agg.qcols, agg.qcols)))
+            agg.merge(file_agg)
+
+            if len(files) > 1:
+                df[SOURCE_COLUMN] = name
+            parts.append(df)
+
+    if not parts:
+        return None, None, errors
+    if len(parts) == 1:
+        return parts[0], agg, errors
+    df = compact_sus_frame(pd.concat(parts, ignore_index=True), agg.qcols)
+    return df, agg, errors
+
+
+def load_sus_files(files, append_to=None):
+    """
+    Importe un lot de fichiers (liste de (contenu binaire, nom)) en un seul
+    dataset, éventuellement ajouté au dataset `append_to`.
+    Retourne (message pour file-info, handle ou None en cas d'erreur).
+    """
+    appending = append_to is not None and get_dataset(append_to) is not None
+
+    # Noms inclus : ils alimentent la colonne SOURCE_COLUMN
+    digest = "+".join(upload_digest(io.BytesIO(payload), _extension(name)) + name
+                      for payload, name in files)
+    if not appending:
+        known = _known_upload(digest, files[0][1] if len(files) == 1 else f"Lot de {len(files)} fichiers")
+        if known:
+            return known
+
+    try:
+        df, agg, errors = ingest_sus_batch(files)
+        if df is None:
+            return next(iter(errors.values()), "Aucun fichier importé."), None
+
+        label = files[0][1] if len(files) == 1 else f"Lot de {len(files) - len(errors)} fichiers"
+        if appending:
+            info, handle = append_sus(df, label, append_to, scored=True)
+        else:
+            info, handle = _register(df, agg, label, digest=None if errors else digest)
+    except SUSColumnsError as e:
+        return str(e), None
+    except Exception as e:
+        return f"❌ Erreur de lecture : {e}", None
+
+    if errors:
+        info += " • ⚠️ Ignorés : " + ", ".join(errors)
+    return info, handle
+
+
+# ==============================================================
+# ➕ Mode ajout : nouvelle vague de réponses sur un dataset chargé
+# ==============================================================
+
+# Identifiant explicite du répondant (réglable) : sans lui, pas de
+# dédoublonnage — une autre colonne (Sexe, Âge…) écarterait de vraies réponses
+RESPONDENT_KEY = os.environ.get("SUS_RESPONDENT_KEY", "Sujet")
+
+
+def _respondent_key(base, new):
+    """RESPONDENT_KEY s'il est présent dans les deux fichiers, sinon None."""
+    if RESPONDENT_KEY in base.columns and RESPONDENT_KEY in new.columns:
+        return RESPONDENT_KEY
+    return None
+
+
+def append_sus(new_df, filename, handle, scored=False):
+    """
+    Ajoute les lignes de new_df au dataset `handle`. Les répondants déjà
+    présents (même RESPONDENT_KEY) sont ignorés ; sans cette colonne,
+    toutes les lignes sont ajoutées. Seules les nouvelles lignes sont
+    scorées (aucune si `scored` : lot déjà scoré par ingest_sus_batch) et
+    les agrégats sont mis à jour sans relire l'existant.
+    Retourne (message, nouveau handle).
+    """
+    base = get_dataset(handle)
+    if base is None:
+        return _register_new(new_df, filename, scored)
+
+    agg = get_aggregates(handle, base).copy()
+    qcols = agg.qcols
+    if not all(q in new_df.columns for q in qcols):
+        raise SUSColumnsError()
+
+    key = _respondent_key(base, new_df)
+    n_read = len(new_df)
+    if key is not None:
+        # Lots multi-fichiers : un même Sujet peut exister dans deux fichiers
+        keys = [key]
+        if SOURCE_COLUMN in base.columns and SOURCE_COLUMN in new_df.columns:
+            keys.append(SOURCE_COLUMN)
+
+        # Clés comparées en texte (comme utils.data_prep.load_data)
+        def as_key(df):
+            return pd.MultiIndex.from_frame(df[keys].astype("string"))
+
+        new_keys = as_key(new_df)
+        fresh = ~new_keys.isin(as_key(base)) & ~new_keys.duplicated()
+        new_df = new_df[fresh]
+
+    scored = new_df if scored else compute_sus(new_df, qcols)
+    agg.update(scored)
+
+    df = base
+    if len(scored):
+        df = compact_sus_frame(pd.concat([base, scored], ignore_index=True), qcols)
+    new_handle = store_dataset(df)
+    _aggregates.set(new_handle, agg)
+
+    if key is not None:
+        dedup = f"{n_read - len(scored)} déjà présentes"
+    else:
+        dedup = f"pas de colonne {RESPONDENT_KEY} : doublons non vérifiés"
+    info = (
+        f"✅ {filename} ajouté — {len(scored)} nouvelles réponses "
+        f"({dedup}) • Total : {agg.count} • "
+        f"Score moyen: {agg.mean:.1f} • {dataset_memory(df)} en mémoire"
+    )
+    return info, new_handle
+
+
+def _register_new(df, filename, scored=False):
+    qcols = find_sus_columns(df)
+    if len(qcols) != 10:
+        raise SUSColumnsError()
+    if not scored:
+        df = compute_sus(df, qcols)
+    agg = SUSAggregates.from_frame(df, qcols)
+    return _register(compact_sus_frame(df, qcols), agg, filename)
+
+
+def _register(df, agg, filename, digest=None):
+    handle = store_dataset(df)
+    _aggregates.set(handle, agg)
+    if digest is not None:
+        _uploads.set(digest, handle)
+    return _imported_info(df, agg, filename), handle
+
+
+def _imported_info(df, agg, filename):
+    return (
+        f"✅ {filename} importé — {agg.count} réponses • "
+        f"Score moyen: {agg.mean:.1f} • {dataset_memory(df)} en mémoire"
+    )
+
+
+# ==============================================================
+# ♻️ Fichier déjà importé : même contenu => même dataset
+# ==============================================================
+
+# Empreinte des octets importés -> handle du dataset scoré
+_uploads = TTLCache(maxsize=4 * DATASET_MAX_ENTRIES, ttl=DATASET_TTL)
+
+
+def _extension(filename):
+    # Le format de lecture dépend de l'extension : elle fait partie de la clé
+    return os.path.splitext(filename or "")[1].lower()
+
+
+def _known_upload(digest, filename):
+    """(message, handle) si ce contenu a déjà été lu et scoré, sinon None."""
+    handle = _uploads.get(digest)
+    df = get_dataset(handle)
+    if df is None:
+        return None
+    return _imported_info(df, get_aggregates(handle, df), filename), handle
+
+
+def load_sus_file(fileobj, filename, append_to=None):
+    """
+    Importe un fichier SUS dans le registre (ou l'ajoute au dataset
+    `append_to`). Retourne (message pour file-info, handle ou None en cas
+    d'erreur).
+    """
+    try:
+        if append_to is not None and get_dataset(append_to) is not None:
+            return append_sus(read_upload(fileobj, filename), filename, append_to)
+
+        # Ré-import du même fichier : ni relecture ni rescoring
+        digest = upload_digest(fileobj, _extension(filename))
+        known = _known_upload(digest, filename)
+        if known:
+            return known
+        df, agg = ingest_sus(fileobj, filename)
+    except SUSColumnsError as e:
+        return str(e), None
+    except Exception as e:
+        return f"❌ Erreur de lecture : {e}", None
+
+    return _register(df, agg, filename, digest=digest)
+
+
+SAMPLE_PATH = os.path.join(os.path.dirname(__file__), "..", "assets", "sample.xlsx")
+SAMPLE_NAME = "sample.xlsx"
+
+
+def load_sample_dataset():
+    """
+    Dataset exemple : scoré au démarrage (voir app.py), puis servi depuis
+    le cache des imports tant qu'il n'a pas expiré.
+    Retourne (message pour file-info, handle).
+    """
+    with open(SAMPLE_PATH, "rb") as f:
+        return load_sus_file(f, SAMPLE_NAME)
+
+
+def append_sus_frame(new_df, filename, append_to, scored=False):
+    """append_sus avec la même gestion d'erreurs que load_sus_file."""
+    try:
+        return append_sus(new_df, filename, append_to, scored)
+    except SUSColumnsError as e:
+        return str(e), None
+    except Exception as e:
+        return f"❌ Erreur de lecture : {e}", None
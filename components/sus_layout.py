@@ -2,11 +2,20 @@
 from dash import html, dcc, dash_table
 import dash_bootstrap_components as dbc
 
+from components.jobs import job_panel
+
 # === SECTIONS ===
 
 # ---- Section Dashboard ----
 dashboard_layout = html.Div([
 
+    # Filtre actif (clic sur une classe ou un groupe de catégorie)
+    html.Div([
+        html.Span(id="sus-filter-label", className="me-3"),
+        dbc.Button("✕ Retirer le filtre", id="btn-clear-filter", size="sm",
+                   color="secondary", outline=True),
+    ], id="sus-filter-bar", className="mb-3 text-center", style={"display": "none"}),
+
     # KPI cards
     dbc.Row([
         dbc.Col(html.Div([
@@ -70,7 +79,8 @@ dashboard_layout = html.Div([
     # Categories
     html.Div([
         html.H4("Analyse par catégorie", className="mt-4 mb-3 text-center"),
-        html.H6("Scores SUS moyens par groupe (effectifs en gris)", className="text-center text-muted mb-3"),
+        html.H6("Scores SUS moyens par groupe (effectifs en gris) — cliquer sur un groupe pour filtrer le tableau de bord",
+                className="text-center text-muted mb-3"),
 
         dbc.Row([
             dbc.Col(dcc.Graph(id="cat-graph-1", config={"displayModeBar": False}), md=6, xs=12),
@@ -113,6 +123,9 @@ ia_layout = html.Div([
         style={"padding": "3px 10px", "whiteSpace": "nowrap", "width": "200px"}
     ),
 
+    # Progression / annulation pendant la tâche IA (callback background)
+    job_panel("sus-ai-job"),
+
 
     # --- Texte explicatif du modèle utilisé ---
     html.P(
@@ -158,6 +171,9 @@ pdf_layout = html.Div([
         style={"marginBottom": "20px"}
     ),
 
+    # Progression / annulation pendant la construction du PDF
+    job_panel("sus-pdf-job"),
+
     dcc.Loading(
         id="loading-pdf",
         type="circle",
@@ -206,11 +222,21 @@ layout = dbc.Container([
                                     color="secondary",
                                     style={"padding": "3px 5px","whiteSpace": "nowrap", "width": "140px"}
                                 ),
-                                multiple=False,
+                                multiple=True,
                                 style={"cursor": "pointer"}
                             ),
                             width="auto"
                         ),
+                        dbc.Col(
+                            dbc.Switch(
+                                id="upload-append",
+                                label="Ajouter une vague",
+                                value=False,
+                                style={"whiteSpace": "nowrap"}
+                            ),
+                            width="auto",
+                            className="d-flex align-items-center"
+                        ),
                         dbc.Col(
                             dbc.Button(
                                 "⭐ Charger exemple",
@@ -271,7 +297,7 @@ layout = dbc.Container([
     # Feedback
     html.Div(id="file-info", style={"display": "none"}),
 
-    dcc.Download(id="download-pdf"),
+    dcc.Store(id="download-pdf-url"),
     dcc.Store(id="data-store", storage_type="session"),
     dcc.Store(id="fig-store", storage_type="session"),
     dcc.Store(id="ai-processing", storage_type="session"),
@@ -0,0 +1,209 @@
+import numpy as np
+import pandas as pd
+
+from components.cache import TTLCache, DATASET_TTL, DATASET_MAX_ENTRIES, dataset_fingerprint
+from components.charts import CLASS_LABELS, category_groups, category_labels, group_label
+from components.sus_data import (
+    N_CATEGORY_COLUMNS, SUS_CLASS_BINS, SUSAggregates, get_aggregates,
+    is_derived_column,
+)
+
+
+# ==============================================================
+# 📊 Résumé statistique unique par dataset
+# ==============================================================
+# KPIs, tableau de stats, graphes par catégorie et prompt IA lisent tous
+# ce même objet : une seule passe sur les données par dataset.
+
+class SUSSummary:
+    """Moments, quantiles, classes, stats par question et par catégorie."""
+
+    def __init__(self, df, agg):
+        self.agg = agg
+        self.fingerprint = dataset_fingerprint(df)
+
+        # --- Score global (agrégats exacts) ---
+        self.count = agg.count
+        self.mean = float(agg.mean)
+        self.std = agg.std
+        self.min = float(agg.min)
+        self.max = float(agg.max)
+        self.median = agg.quantile(0.5)
+        self.q1 = agg.quantile(0.25)
+        self.q3 = agg.quantile(0.75)
+        self.pct_ge80 = float(agg.pct_ge80)
+        self.pct_lt50 = agg.pct(lambda v: v < 50)
+        self.class_counts = agg.class_counts.copy()
+        self.stats_table = agg.stats_table()
+
+        # --- Par question ---
+        items = df[agg.qcols].to_numpy(dtype=np.float64, na_value=np.nan)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            valid = (~np.isnan(items)).sum(axis=0)
+            stds = np.sqrt(np.nansum((items - np.nanmean(items, axis=0)) ** 2, axis=0) / (valid - 1))
+        self.item_means = agg.item_means
+        self.item_stds = dict(zip(agg.qcols, stds))
+
+        # --- Par catégorie (colonnes suivant la dernière question) ---
+        self.category_slots = category_slots(df, agg.qcols)
+        self.categories = {
+            col: category_groups(df, col)
+            for col in self.category_slots if col is not None
+        }
+
+        # --- Index des lignes par groupe (filtres croisés) ---
+        self.group_index = {
+            str(col): group_index(df, col)
+            for col in self.category_slots if col is not None
+        }
+        self.class_index = class_index(df)
+
+    @property
+    def classes(self):
+        """Effectif par classe SUS (libellés sans retour à la ligne)."""
+        labels = [label.replace("<br>", " ") for label in CLASS_LABELS]
+        return dict(zip(labels, self.class_counts.tolist()))
+
+    def category_means(self):
+        """Moyenne SUS par groupe, pour chaque catégorie non vide."""
+        return {
+            col: dict(zip(grouped["group"].astype(str), grouped["SUS_mean"].round(2)))
+            for col, grouped in self.categories.items()
+            if grouped is not None and not grouped.empty
+        }
+
+
+def _split_positions(codes, n_groups):
+    """Positions (triées) des lignes de chaque code 0..n_groups-1."""
+    order = np.argsort(codes, kind="stable")
+    bounds = np.cumsum(np.bincount(codes, minlength=n_groups))[:-1]
+    return np.split(order, bounds)
+
+
+def group_index(df, col):
+    """{libellé du groupe : positions des lignes}, mêmes groupes que les graphes."""
+    labels = category_labels(df, col)
+    if labels is None:
+        return {}
+
+    codes, uniques = pd.factorize(labels, sort=True)
+    positions = df.index.get_indexer(labels.index)
+    known = codes >= 0
+    codes, positions = codes[known], positions[known]
+    index = {}
+    for value, rows in zip(uniques, _split_positions(codes, len(uniques))):
+        # Deux intervalles peuvent partager un libellé arrondi : fusion
+        key = group_label(value)
+        rows = positions[rows]
+        index[key] = np.union1d(index[key], rows) if key in index else rows
+    return index
+
+
+def class_index(df):
+    """Positions des lignes par classe SUS (même découpage que les agrégats)."""
+    scores = df["SUS_Score"].to_numpy(dtype=float)
+    idx = np.searchsorted(SUS_CLASS_BINS, scores, side="right") - 1
+    n_classes = len(SUS_CLASS_BINS) - 1
+    valid = ~np.isnan(scores) & (idx >= 0) & (idx < n_classes)
+    rows = np.flatnonzero(valid)
+    return [rows[part] for part in _split_positions(idx[valid], n_classes)]
+
+
+def category_slots(df, qcols):
+    """
+    Les N_CATEGORY_COLUMNS colonnes qui suivent la dernière question ; None
+    pour une position vide, absente ou occupée par une colonne ajoutée par
+    l'application (SUS_Score, _adj, Fichier_source).
+    """
+    cols = list(df.columns)
+    if not qcols or qcols[-1] not in cols:
+        return [None] * N_CATEGORY_COLUMNS
+
+    start = cols.index(qcols[-1]) + 1
+    raw = cols[start:start + N_CATEGORY_COLUMNS]
+    slots = [
+        None if is_derived_column(c) or df[c].dropna().empty else c
+        for c in raw
+    ]
+    return slots + [None] * (N_CATEGORY_COLUMNS - len(slots))
+
+
+def report_categories(df, summary):
+    """
+    [(position, colonne, groupes)] des graphes par catégorie du rapport :
+    emplacements du résumé (ceux du dashboard), groupes du résumé si `df`
+    est son dataset, recalculés sinon (sous-population filtrée). Les
+    catégories sans groupe sont ignorées.
+    """
+    own = dataset_fingerprint(df) == summary.fingerprint
+    categories = []
+    for i, col in enumerate(summary.category_slots):
+        if col is None:
+            continue
+        grouped = summary.categories[col] if own else category_groups(df, col)
+        if grouped is not None and not grouped.empty:
+            categories.append((i, col, grouped))
+    return categories
+
+
+_summaries = TTLCache(maxsize=DATASET_MAX_ENTRIES, ttl=DATASET_TTL)
+
+
+def get_summary(handle, df):
+    """Résumé du dataset, calculé au premier appel puis partagé."""
+    summary = _summaries.get(handle)
+    if summary is None:
+        summary = SUSSummary(df, get_aggregates(handle, df))
+        _summaries.set(handle, summary)
+    return summary
+
+
+# ==============================================================
+# 🔎 Filtres croisés : sous-population sélectionnée au clic
+# ==============================================================
+# Filtre = {colonne: libellé du groupe, CLASS_FILTER: n° de classe}. Les
+# lignes retenues sont l'intersection des index précalculés ; seuls les
+# agrégats de cette sous-population sont recalculés.
+
+CLASS_FILTER = "__classe__"
+
+_views = TTLCache(maxsize=4 * DATASET_MAX_ENTRIES, ttl=DATASET_TTL)
+
+
+def filter_rows(summary, filters):
+    """Positions des lignes vérifiant tous les filtres ; None si aucun filtre."""
+    rows = None
+    for key, value in sorted((filters or {}).items()):
+        if key == CLASS_FILTER:
+            part = summary.class_index[int(value)]
+        else:
+            part = summary.group_index.get(key, {}).get(value)
+            if part is None:
+                continue        # groupe inconnu pour ce dataset : ignoré
+        rows = part if rows is None else np.intersect1d(rows, part, assume_unique=True)
+    return rows
+
+
+def filtered_view(handle, df, filters, exclude=None):
+    """
+    (DataFrame, agrégats) de la sous-population filtrée ; le dataset
+    complet si aucun filtre. `exclude` : dimension ignorée (le graphe qui
+    porte la sélection reste entier). Vues mises en cache : le même objet
+    est retourné, figures mémoïsées comprises.
+    """
+    filters = {k: v for k, v in (filters or {}).items() if k != exclude}
+    summary = get_summary(handle, df)
+    if not filters:
+        return df, summary.agg
+
+    key = (handle, tuple(sorted(filters.items())))
+    view = _views.get(key)
+    if view is None:
+        rows = filter_rows(summary, filters)
+        if rows is None:
+            view = (df, summary.agg)
+        else:
+            sub = df.iloc[rows].reset_index(drop=True)
+            view = (sub, SUSAggregates.from_frame(sub, summary.agg.qcols))
+        _views.set(key, view)
+    return view
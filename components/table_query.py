@@ -0,0 +1,184 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from components.cache import TTLCache, DATASET_TTL, dataset_fingerprint
+
+
+# ============================================================
+# Pagination / tri / filtre côté serveur pour les DataTable
+# (page_action / sort_action / filter_action = "custom")
+# ============================================================
+
+PAGE_SIZE = 25
+
+# Opérateurs de la syntaxe filter_query de dash_table
+_OPERATORS = {
+    "=": "eq", "eq": "eq",
+    "!=": "ne", "ne": "ne",
+    "<": "lt", "lt": "lt",
+    "<=": "le", "le": "le",
+    ">": "gt", "gt": "gt",
+    ">=": "ge", "ge": "ge",
+    "contains": "contains",
+    "datestartswith": "datestartswith",
+}
+
+_PART = re.compile(r"^\s*\{(?P<col>.+?)\}\s+(?P<op>\S+)(?:\s+(?P<value>.+?))?\s*$", re.S)
+
+# Index (filtré + trié) déjà calculés : le changement de page ne coûte qu'un découpage
+_views = TTLCache(maxsize=64, ttl=DATASET_TTL)
+
+
+def table_columns(df, columns=None, names=None):
+    """
+    Définition des colonnes (type numérique => filtres =, <, > du DataTable).
+    `names` : libellés affichés, si différents des identifiants.
+    """
+    columns = list(df.columns) if columns is None else columns
+    names = names or columns
+    return [
+        {
+            "name": name,
+            "id": c,
+            "type": "numeric" if pd.api.types.is_numeric_dtype(df[c]) else "text",
+        }
+        for c, name in zip(columns, names)
+    ]
+
+
+def _unquote(value):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'`":
+        return value[1:-1]
+    return value
+
+
+def _as_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _part_mask(df, part):
+    """Masque booléen pour un terme « {col} op valeur » ; None si ignoré."""
+    m = _PART.match(part)
+    if not m or m["col"] not in df.columns:
+        return None
+
+    col = df[m["col"]]
+    op = m["op"]
+    value = m["value"]
+
+    # Opérateurs unaires
+    if op == "is" and value:
+        kind = value.strip()
+        if kind in ("blank", "nil"):
+            blank = col.isna()
+            if kind == "blank" and not pd.api.types.is_numeric_dtype(col):
+                blank |= col.astype("string").str.strip().eq("").fillna(False)
+            return blank.to_numpy()
+        if kind == "num":
+            return pd.to_numeric(col, errors="coerce").notna().to_numpy()
+        if kind == "str":
+            return (~col.isna() & pd.to_numeric(col, errors="coerce").isna()).to_numpy()
+        return None
+
+    if value is None:
+        return None
+
+    # Préfixes i / s : casse ignorée / respectée (respectée par défaut)
+    case = True
+    if op[:1] in ("i", "s") and op[1:] in _OPERATORS:
+        case = op[0] == "s"
+        op = op[1:]
+    op = _OPERATORS.get(op)
+    if op is None:
+        return None
+
+    value = _unquote(value)
+    number = _as_number(value)
+
+    if op in ("contains", "datestartswith"):
+        text = col.astype("string")
+        if op == "datestartswith":
+            return text.str.startswith(value).fillna(False).to_numpy(dtype=bool)
+        return text.str.contains(value, case=case, regex=False).fillna(False).to_numpy(dtype=bool)
+
+    # Comparaisons : numériques si possible, sinon sur le texte
+    if pd.api.types.is_numeric_dtype(col) and number is not None:
+        left, right = col.to_numpy(dtype=float, na_value=np.nan), number
+    else:
+        left = col.astype("string")
+        right = value
+        if not case:
+            left, right = left.str.lower(), value.lower()
+
+    with np.errstate(invalid="ignore"):
+        mask = {
+            "eq": lambda: left == right,
+            "ne": lambda: left != right,
+            "lt": lambda: left < right,
+            "le": lambda: left <= right,
+            "gt": lambda: left > right,
+            "ge": lambda: left >= right,
+        }[op]()
+    return pd.Series(mask).fillna(False).to_numpy(dtype=bool)
+
+
+def filter_mask(df, filter_query):
+    """Traduit filter_query (termes reliés par &&) en un masque vectorisé."""
+    mask = np.ones(len(df), dtype=bool)
+    if not filter_query:
+        return mask
+    for part in filter_query.split(" && "):
+        part_mask = _part_mask(df, part)
+        if part_mask is not None:
+            mask &= part_mask
+    return mask
+
+
+def _view_index(df, sort_by, filter_query):
+    """Positions des lignes filtrées puis triées (mises en cache)."""
+    sort_key = tuple((s["column_id"], s["direction"]) for s in (sort_by or []))
+    key = (dataset_fingerprint(df), filter_query or "", sort_key)
+
+    index = _views.get(key)
+    if index is None:
+        index = np.flatnonzero(filter_mask(df, filter_query))
+        sort_key = [(c, d) for c, d in sort_key if c in df.columns]
+        if sort_key:
+            view = df.iloc[index].reset_index(drop=True)
+            order = view.sort_values(
+                [c for c, _ in sort_key],
+                ascending=[d == "asc" for _, d in sort_key],
+                kind="stable",
+                na_position="last",
+            ).index.to_numpy()
+            index = index[order]
+        _views.set(key, index)
+    return index
+
+
+def table_page(df, page_current, page_size, sort_by=None, filter_query="", columns=None):
+    """
+    Retourne (lignes de la page en records, nombre de pages, page courante)
+    après filtre et tri. La page est ramenée dans les bornes (un filtre peut
+    réduire le nombre de pages) : le tableau doit recevoir cette valeur.
+    Seule la page demandée (colonnes `columns`) est sérialisée.
+    """
+    page_size = page_size or PAGE_SIZE
+    index = _view_index(df, sort_by, filter_query)
+
+    page_count = max(int(np.ceil(len(index) / page_size)), 1)
+    page_current = min(page_current or 0, page_count - 1)
+    start = page_current * page_size
+
+    page = df.iloc[index[start:start + page_size]]
+    if columns is not None:
+        page = page[columns]
+    # NaN / NA -> null pour le JSON
+    records = page.astype(object).where(page.notna(), None).to_dict("records")
+    return records, page_count, page_current
@@ -0,0 +1,96 @@
+import io
+
+from flask import Request, jsonify, request
+
+from components.cache import store_dataset
+from components.sus_data import load_sus_file, load_sus_files, read_upload
+from components.attrakdiff_callbacks import read_file
+
+
+# ============================================================
+# Upload HTTP direct (multipart) — évite le base64 de dcc.Upload
+# ============================================================
+
+MAX_UPLOAD_SIZE = 100 * 1024 * 1024     # requête entière ; au-delà : 413
+
+
+class InMemoryRequest(Request):
+    """
+    Requête dont les fichiers multipart restent en mémoire (BytesIO).
+    Werkzeug bascule par défaut les fichiers > 500 Ko sur disque : aucune
+    donnée importée ne doit y être écrite (mention RGPD de l'accueil).
+    La taille est bornée par MAX_CONTENT_LENGTH.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type,
+                         filename=None, content_length=None):
+        return io.BytesIO()
+
+
+def uploaded_files():
+    """Fichiers reçus : liste des (flux en mémoire, nom du fichier)."""
+    return [(f.stream, f.filename)
+            for f in request.files.getlist("file") if f and f.filename]
+
+
+def take_bytes(stream):
+    """Contenu d'un fichier reçu ; son tampon est libéré aussitôt."""
+    data = stream.getvalue()
+    stream.close()
+    return data
+
+
+def register_routes(app):
+    server = app.server
+    # Flask définit déjà la clé (None) : setdefault serait sans effet
+    server.config["MAX_CONTENT_LENGTH"] = MAX_UPLOAD_SIZE
+    server.request_class = InMemoryRequest
+
+    @server.errorhandler(413)
+    def upload_too_large(_):
+        mo = MAX_UPLOAD_SIZE // (1024 * 1024)
+        return jsonify(error=f"Fichier trop volumineux ({mo} Mo maximum)."), 413
+
+    @server.route("/api/upload/sus", methods=["POST"])
+    def upload_sus():
+        files = uploaded_files()
+        if not files:
+            return jsonify(info="Aucun fichier importé.", handle=None), 400
+
+        # Plusieurs fichiers : lot traité en parallèle (pool de processus).
+        # Chaque tampon est libéré dès sa copie : une seule copie par fichier.
+        if len(files) > 1:
+            files = [(take_bytes(stream), name) for stream, name in files]
+            filename = ", ".join(name for _, name in files)
+            info, handle = load_sus_files(files)
+            if handle and request.form.get("append") == "1":
+                # Lot déjà scoré : la fusion ne rescore pas ces lignes
+                return jsonify(handle=handle, filename=f"Lot de {len(files)} fichiers",
+                               append=True, scored=True)
+            return jsonify(info=info, handle=handle, filename=filename), (200 if handle else 400)
+
+        stream, filename = files[0]
+
+        # Mode ajout : fichier brut enregistré, fusion faite par le
+        # callback qui connaît le dataset courant (data-store)
+        if request.form.get("append") == "1":
+            try:
+                df = read_upload(stream, filename)
+            except Exception as e:
+                return jsonify(error=str(e)), 400
+            return jsonify(handle=store_dataset(df), filename=filename, append=True)
+
+        info, handle = load_sus_file(stream, filename)
+        return jsonify(info=info, handle=handle, filename=filename), (200 if handle else 400)
+
+    @server.route("/api/upload/attrakdiff", methods=["POST"])
+    def upload_attrakdiff():
+        files = uploaded_files()
+        if not files:
+            return jsonify(error="Aucun fichier reçu."), 400
+        stream, filename = files[0]
+        try:
+            df = read_file(stream, filename)
+        except Exception as e:
+            return jsonify(error=str(e)), 400
+        return jsonify(handle=store_dataset(df), filename=filename)
@@ -0,0 +1,37 @@
+"""
+Micro-benchmark des constructeurs de figures, FAST_FIGURES désactivé puis
+activé (temps moyen par appel, sans mémoïsation) :
+
+    python tests/bench_charts.py [répétitions]
+"""
+import sys
+import time
+
+from conftest import load_sample, synthetic_sus
+from test_chart_parity import CASES, _cases
+
+from components import charts
+
+
+def _mean_ms(build, args, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        build(*args)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main(repeat=20):
+    cases = _cases(load_sample(), synthetic_sus())
+    print(f"{'figure':18s} {'go.Figure':>10s} {'dict':>10s}")
+    for case in CASES:
+        builder, args = cases[case]
+        build = getattr(builder, "__wrapped__", builder)
+        charts.FAST_FIGURES = False
+        slow = _mean_ms(build, args, repeat)
+        charts.FAST_FIGURES = True
+        fast = _mean_ms(build, args, repeat)
+        print(f"{case:18s} {slow:8.2f} ms {fast:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
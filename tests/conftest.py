@@ -0,0 +1,58 @@
+import io
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from components.sus_data import compute_sus, find_sus_columns, ingest_sus
+
+
+# ============================================================
+# Jeux de données communs aux tests
+# ============================================================
+
+def load_sample():
+    """Exemple de l'application (assets/sample.xlsx), scoré."""
+    df = pd.read_excel(os.path.join(ROOT, "assets", "sample.xlsx"))
+    return compute_sus(df, find_sus_columns(df))
+
+
+# Générateurs des colonnes de catégories (après Q10)
+CATEGORY_GENERATORS = {
+    "Age": lambda rng, n: rng.integers(18, 70, n),
+    "Sexe": lambda rng, n: rng.choice(["H", "F"], n),
+    "Poste": lambda rng, n: rng.choice(["Dev", "PO", "Design", "Support"], n),
+    "Anciennete": lambda rng, n: rng.integers(0, 30, n),
+}
+
+
+def synthetic_csv(n=5000, categories=("Age", "Sexe"), seed=0):
+    """Octets d'un CSV SUS synthétique : Sujet, Q1..Q10 puis `categories`."""
+    rng = np.random.default_rng(seed)
+    raw = pd.DataFrame({
+        "Sujet": np.arange(n),
+        **{f"Q{i}": rng.integers(1, 6, n) for i in range(1, 11)},
+        **{name: CATEGORY_GENERATORS[name](rng, n) for name in categories},
+    })
+    return raw.to_csv(index=False).encode()
+
+
+def synthetic_sus(n=5000, categories=("Age", "Sexe"), seed=0):
+    """n réponses synthétiques, passées par l'ingestion CSV."""
+    df, _ = ingest_sus(io.BytesIO(synthetic_csv(n, categories, seed)), "synthetique.csv")
+    return df
+
+
+@pytest.fixture(scope="session")
+def sample_df():
+    return load_sample()
+
+
+@pytest.fixture(scope="session")
+def big_df():
+    return synthetic_sus()
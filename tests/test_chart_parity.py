@@ -0,0 +1,108 @@
+import json
+
+import plotly.io as pio
+import pytest
+from plotly.utils import PlotlyJSONEncoder
+
+from components import charts
+from components.cache import store_dataset
+from components.sus_data import SOURCE_COLUMN, ingest_sus_batch
+from components.sus_summary import get_summary
+
+from conftest import CATEGORY_GENERATORS, synthetic_csv, synthetic_sus
+
+
+# ============================================================
+# FAST_FIGURES : les figures « dict » doivent produire exactement le
+# même JSON que les versions go.Figure
+# ============================================================
+
+def _cases(sample_df, big_df):
+    return {
+        "empty": (charts.empty_fig, ()),
+        "gauge": (charts.create_gauge_native, (52.34375,)),
+        "gauge_max": (charts.create_gauge_native, (100.0,)),
+        "histogram": (charts.create_main_histogram, (sample_df,)),
+        "histogram_big": (charts.create_main_histogram, (big_df,)),
+        "radar": (charts.create_radar, (sample_df,)),
+        "class": (charts.create_sus_class_histogram, (sample_df,)),
+        "class_big": (charts.create_sus_class_histogram, (big_df,)),
+        **{
+            f"category_{c}": (charts.create_category_combined, (sample_df, sample_df.columns[c], i))
+            for i, c in enumerate(range(11, 15))
+        },
+        **{
+            f"category_big_{c}": (charts.create_category_combined, (big_df, big_df.columns[c], i))
+            for i, c in enumerate(range(11, 13))
+        },
+    }
+
+
+CASES = [
+    "empty", "gauge", "gauge_max", "histogram", "histogram_big", "radar",
+    "class", "class_big", "category_11", "category_12", "category_13",
+    "category_14", "category_big_11", "category_big_12",
+]
+
+
+def _parity(build, *args, monkeypatch):
+    monkeypatch.setattr(charts, "FAST_FIGURES", False)
+    reference = _as_json(build(*args))
+    monkeypatch.setattr(charts, "FAST_FIGURES", True)
+    fast = _as_json(build(*args))
+
+    assert fast["data"] == reference["data"]
+    assert fast["layout"] == reference["layout"]
+
+
+def _as_json(fig):
+    if isinstance(fig, dict):
+        return json.loads(json.dumps(fig, cls=PlotlyJSONEncoder))
+    return json.loads(pio.to_json(fig, validate=False))
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_fast_figure_matches_plotly(case, sample_df, big_df, monkeypatch):
+    builder, args = _cases(sample_df, big_df)[case]
+    build = getattr(builder, "__wrapped__", builder)     # sans mémoïsation
+    _parity(build, *args, monkeypatch=monkeypatch)
+
+
+# ============================================================
+# Graphes par catégorie tels que le dashboard les construit : fichiers
+# de 0 à 3 catégories, seuls ou en lot (colonne Fichier_source)
+# ============================================================
+
+def _slot_dataset(kind, n_categories):
+    categories = list(CATEGORY_GENERATORS)[:n_categories]
+    if kind == "single":
+        return synthetic_sus(300, categories, seed=10 + n_categories)
+    files = [
+        (synthetic_csv(150, categories, seed=20 + seed), f"vague{seed}.csv")
+        for seed in (1, 2)
+    ]
+    df, _, errors = ingest_sus_batch(files)
+    assert not errors and SOURCE_COLUMN in df.columns
+    return df
+
+
+@pytest.mark.parametrize("n_categories", range(4))
+@pytest.mark.parametrize("kind", ["single", "batch"])
+def test_fast_category_slots_match_plotly(kind, n_categories, monkeypatch):
+    df = _slot_dataset(kind, n_categories)
+    summary = get_summary(store_dataset(df), df)
+    slots = [col for col in summary.category_slots if col is not None]
+    assert slots == list(CATEGORY_GENERATORS)[:n_categories]
+
+    build = charts.create_category_combined.__wrapped__
+    for i, col in enumerate(summary.category_slots):
+        if col is None:
+            continue
+        # Groupes du résumé (dashboard, PDF) puis recalculés (sous-population)
+        _parity(build, df, col, i, summary.categories[col], monkeypatch=monkeypatch)
+        _parity(build, df, col, i, monkeypatch=monkeypatch)
+
+    if kind == "batch":
+        for builder in (charts.create_main_histogram, charts.create_radar,
+                        charts.create_sus_class_histogram):
+            _parity(getattr(builder, "__wrapped__", builder), df, monkeypatch=monkeypatch)
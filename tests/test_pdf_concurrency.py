@@ -0,0 +1,106 @@
+import datetime as dt
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import fpdf.fpdf
+import numpy as np
+import plotly
+import pytest
+
+import components.attrakdiff_callbacks as attrakdiff
+import components.export_pdf as export_pdf
+from components import charts
+from components.cache import dataset_fingerprint
+from components.sus_data import SOURCE_COLUMN, SUSAggregates, compute_sus, find_sus_columns, ingest_sus_batch
+from components.sus_summary import get_summary
+
+from conftest import CATEGORY_GENERATORS, load_sample, synthetic_csv, synthetic_sus
+
+
+# ============================================================
+# Exports PDF simultanés (threads d'un même worker) : chaque rapport
+# doit être identique à celui produit seul
+# ============================================================
+
+FIXED_NOW = dt.datetime(2026, 1, 1, 12, 0, tzinfo=dt.timezone.utc)
+
+
+class _FixedDatetime(dt.datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return FIXED_NOW
+
+
+@pytest.fixture(autouse=True)
+def fixed_dates(monkeypatch):
+    # Dates d'en-tête et de métadonnées figées : PDF comparables octet à octet
+    for module in (fpdf.fpdf, export_pdf, attrakdiff):
+        monkeypatch.setattr(module, "datetime", _FixedDatetime)
+
+
+def _sus_frame(kind, seed):
+    """Exemple rescoré, fichier synthétique de `seed` % 4 catégories, ou lot."""
+    categories = list(CATEGORY_GENERATORS)[:seed % 4]
+    if kind == "single":
+        return synthetic_sus(120, categories, seed=seed)
+    if kind == "batch":
+        files = [(synthetic_csv(60, categories, seed=seed * 10 + i), f"vague{i}.csv") for i in (1, 2)]
+        df, _, errors = ingest_sus_batch(files)
+        assert not errors and SOURCE_COLUMN in df.columns
+        return df
+    base = load_sample()
+    questions = find_sus_columns(base)
+    rng = np.random.default_rng(seed)
+    base[questions] = rng.integers(1, 6, (len(base), 10))
+    return compute_sus(base, questions)
+
+
+def _sus_report(kind, seed):
+    df = _sus_frame(kind, seed)
+    agg = SUSAggregates.from_frame(df, find_sus_columns(df))
+    figs = {
+        "gauge": charts.create_gauge_native(agg.mean),
+        "hist": charts.create_main_histogram(df),
+        "radar": charts.create_radar(df),
+        "class": charts.create_sus_class_histogram(df),
+    }
+    # Figures telles que reçues du dcc.Store (JSON)
+    figs = json.loads(json.dumps(figs, cls=plotly.utils.PlotlyJSONEncoder))
+    return df, figs, f"#### Rapport {seed}\nTexte du rapport {seed}", agg.stats_table().to_dict("records")
+
+
+def _attrakdiff_report(seed):
+    n = 20 + seed
+    scores, stats = attrakdiff.compute_scores(attrakdiff.make_sample_df(n))
+    return scores, n, f"#### Analyse {seed}\nligne", stats
+
+
+def test_parallel_sus_exports_match_sequential():
+    # Exemple (4 catégories), fichiers de 0 à 3 catégories, lots (Fichier_source)
+    reports = [
+        _sus_report(kind, seed)
+        for kind, seeds in (("sample", (0, 1)), ("single", range(4)), ("batch", (1, 3)))
+        for seed in seeds
+    ]
+    with ThreadPoolExecutor(len(reports)) as executor:
+        parallel = list(executor.map(lambda args: export_pdf.generate_sus_pdf(*args), reports))
+
+    # Référence construite hors cache PDF, un rapport à la fois
+    sequential = [
+        export_pdf._build_sus_pdf(df, *rest, get_summary(dataset_fingerprint(df), df))
+        for df, *rest in reports
+    ]
+
+    assert parallel == sequential
+    assert len(set(parallel)) == len(reports)
+
+
+def test_parallel_attrakdiff_exports_match_sequential():
+    reports = [_attrakdiff_report(seed) for seed in range(4)]
+    with ThreadPoolExecutor(len(reports)) as executor:
+        parallel = list(executor.map(lambda args: attrakdiff.generate_pdf(*args), reports))
+
+    sequential = [attrakdiff.generate_pdf(*args) for args in reports]
+
+    assert parallel == sequential
+    assert len(set(parallel)) == len(reports)
@@ -0,0 +1,42 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from components.cache import get_dataset
+from components.sus_data import load_sus_file
+
+from conftest import synthetic_csv
+
+
+# ============================================================
+# Mode ajout : dédoublonnage sur l'identifiant du répondant seulement
+# ============================================================
+
+def _wave_without_subject(n, seed):
+    """Vague sans colonne Sujet, colonne A démographique (Sexe)."""
+    rng = np.random.default_rng(seed)
+    raw = pd.DataFrame({
+        "Sexe": rng.choice(["H", "F"], n),
+        **{f"Q{i}": rng.integers(1, 6, n) for i in range(1, 11)},
+    })
+    return io.BytesIO(raw.to_csv(index=False).encode())
+
+
+def test_append_without_subject_keeps_every_row():
+    _, handle = load_sus_file(_wave_without_subject(50, seed=1), "vague1.csv")
+    info, new_handle = load_sus_file(_wave_without_subject(100, seed=2), "vague2.csv", append_to=handle)
+
+    assert len(get_dataset(new_handle)) == 150
+    assert "100 nouvelles réponses" in info
+    assert "doublons non vérifiés" in info
+
+
+def test_append_with_subject_skips_known_respondents():
+    _, handle = load_sus_file(io.BytesIO(synthetic_csv(100, seed=1)), "vague1.csv")
+    # Mêmes Sujet 0..99 puis 100..149 : seuls les 50 derniers sont nouveaux
+    wave = synthetic_csv(150, seed=2)
+    info, new_handle = load_sus_file(io.BytesIO(wave), "vague2.csv", append_to=handle)
+
+    assert len(get_dataset(new_handle)) == 150
+    assert "50 nouvelles réponses (100 déjà présentes)" in info
@@ -0,0 +1,77 @@
+import pytest
+
+from components.cache import store_dataset
+from components.charts import create_category_combined
+from components.sus_data import N_CATEGORY_COLUMNS, SOURCE_COLUMN, ingest_sus_batch
+from components.sus_summary import get_summary
+
+from conftest import CATEGORY_GENERATORS, synthetic_csv, synthetic_sus
+
+
+# ============================================================
+# Emplacements de catégories : seules les colonnes du fichier comptent,
+# jamais SUS_Score ni Fichier_source ajoutés par l'application
+# ============================================================
+
+def _check_summary(df, expected):
+    summary = get_summary(store_dataset(df), df)
+    slots = summary.category_slots
+    assert len(slots) == N_CATEGORY_COLUMNS
+    assert [c for c in slots if c is not None] == list(expected)
+    assert set(summary.categories) == set(expected)
+    for i, col in enumerate(slots):
+        if col is not None:
+            create_category_combined(df, col, i, grouped=summary.categories[col])
+    return summary
+
+
+@pytest.mark.parametrize("n_categories", range(len(CATEGORY_GENERATORS) + 1))
+def test_category_slots_single_file(n_categories):
+    categories = list(CATEGORY_GENERATORS)[:n_categories]
+    df = synthetic_sus(200, categories, seed=n_categories)
+    summary = _check_summary(df, categories)
+    assert summary.count == 200
+
+
+@pytest.mark.parametrize("n_categories", [0, 1, 3])
+def test_category_slots_batch_file(n_categories):
+    categories = list(CATEGORY_GENERATORS)[:n_categories]
+    files = [
+        (synthetic_csv(100, categories, seed=seed), f"vague{seed}.csv")
+        for seed in (1, 2)
+    ]
+    df, agg, errors = ingest_sus_batch(files)
+    assert not errors
+    assert SOURCE_COLUMN in df.columns
+    summary = _check_summary(df, categories)
+    assert summary.count == agg.count == 200
+
+
+class _Rendered(Exception):
+    pass
+
+
+def test_report_reuses_dashboard_category_figures(monkeypatch):
+    import components.export_pdf as export_pdf
+
+    df = synthetic_sus(200, ["Sexe", "Age", "Poste"], seed=7)
+    handle = store_dataset(df)
+    summary = get_summary(handle, df)
+    dashboard = {
+        col: create_category_combined(df, col, i, summary.categories[col])
+        for i, col in enumerate(summary.category_slots) if col is not None
+    }
+
+    batches = []
+
+    def capture(batch, progress=None):
+        batches.append(batch)
+        raise _Rendered
+
+    monkeypatch.setattr(export_pdf, "render_pngs", capture)
+    with pytest.raises(_Rendered):
+        export_pdf._build_sus_pdf(df, {}, "", [], summary)
+
+    # Figures mémoïsées du dashboard : mêmes objets, aucune reconstruction
+    report = [fig for key, fig in batches[0].items() if key.startswith("cat")]
+    assert [id(fig) for fig in report] == [id(fig) for fig in dashboard.values()]
@@ -0,0 +1,22 @@
+from components.table_query import table_page
+
+
+# ============================================================
+# Pagination serveur : page ramenée dans les bornes après filtre
+# ============================================================
+
+def test_filter_clamps_current_page(sample_df):
+    records, page_count, page_current = table_page(sample_df, 40, 10)
+    assert page_current == page_count - 1
+    assert records
+
+    high = sample_df["SUS_Score"] > 80
+    records, page_count, page_current = table_page(sample_df, 40, 10, filter_query="{SUS_Score} > 80")
+    assert page_count == max(-(-int(high.sum()) // 10), 1)
+    assert page_current == page_count - 1
+    assert records and all(r["SUS_Score"] > 80 for r in records)
+
+
+def test_empty_filter_result_stays_on_first_page(sample_df):
+    records, page_count, page_current = table_page(sample_df, 3, 10, filter_query="{SUS_Score} > 1000")
+    assert (records, page_count, page_current) == ([], 1, 0)
@@ -1,12 +1,7 @@
 import pandas as pd
 from pathlib import Path
 
-def calculate_sus(row):
-    score = 0
-    for i in range(10):
-        val = row[i]
-        score += val - 1 if i % 2 == 0 else 5 - val
-    return score * 2.5
+from utils.sus_scoring import sus_scores
 
 def prepare_data(df: pd.DataFrame) -> tuple[pd.DataFrame, dict]:
     questions = [f"Question{i}" for i in range(1, 11)]
@@ -22,7 +17,7 @@ def prepare_data(df: pd.DataFrame) -> tuple[pd.DataFrame, dict]:
         for col in custom_columns
     }
 
-    df["SUS_Score"] = df[questions].apply(calculate_sus, axis=1)
+    df["SUS_Score"] = sus_scores(df[questions].to_numpy(dtype=float), skipna=False)
     return df, category_info
 
 def load_data(filepath: str = "data/data.xlsx"):
@@ -0,0 +1,25 @@
+import numpy as np
+
+# ============================================================
+# Noyau de scoring SUS vectorisé — matrice (n, 10) des réponses
+# Items impairs : réponse − 1 · items pairs : 5 − réponse
+# ============================================================
+
+SUS_SIGN = np.array([1.0, -1.0] * 5)
+SUS_OFFSET = np.array([-1.0, 5.0] * 5)
+
+
+def sus_adjusted(items: np.ndarray) -> np.ndarray:
+    """Scores ajustés (0–4) de chaque item, même forme que `items`."""
+    return items * SUS_SIGN + SUS_OFFSET
+
+
+def sus_scores(items: np.ndarray, skipna: bool = True) -> np.ndarray:
+    """
+    Score SUS (0–100) de chaque ligne.
+    skipna=True : les réponses manquantes sont ignorées dans la somme ;
+    skipna=False : une réponse manquante donne un score NaN.
+    """
+    adj = sus_adjusted(np.asarray(items, dtype=np.float64))
+    total = np.nansum(adj, axis=1) if skipna else adj.sum(axis=1)
+    return total * 2.5